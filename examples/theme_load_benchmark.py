@@ -0,0 +1,68 @@
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import pyglet
+from pyglet2_gui.theme import ThemeFromPath
+from pyglet2_gui.theme.resources import ResourceRegistry
+
+# Compares the decoding of theme images in the loading thread and in a process pool,
+# for a theme and for a set of large generated images, where the decoding dominates.
+# The pool only speeds the decoding up with several cores.
+# Usage: python theme_load_benchmark.py [theme path] [repeats]
+
+theme_path = sys.argv[1] if len(sys.argv) > 1 else "theme/default"
+repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+workers = os.cpu_count() or 1
+window = pyglet.window.Window(visible=False)  # a GL context for the textures
+
+
+def measure_theme(decode_workers: int) -> float:
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        theme = ThemeFromPath(theme_path, decode_workers=decode_workers)
+        elapsed = time.perf_counter() - start
+        # release the textures, so the next load decodes them again.
+        theme.release()
+        del theme
+        gc.collect()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def write_images(directory: str, count: int, size: int) -> list[str]:
+    filenames = []
+    for index in range(count):
+        filename = f"image{index}.png"
+        pixels = bytes(random.getrandbits(8) for _ in range(size * size * 4))
+        path = os.path.join(directory, filename)
+        with open(path, 'wb') as file:
+            pyglet.image.ImageData(size, size, 'RGBA', pixels).save(path, file=file)
+        filenames.append(filename)
+    return filenames
+
+
+def measure_images(directory: str, filenames: list[str], decode_workers: int) -> float:
+    best = None
+    for _ in range(repeats):
+        registry = ResourceRegistry()  # nothing is decoded yet
+        start = time.perf_counter()
+        registry.discard_decoded(registry.preload(directory, filenames, decode_workers))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(name: str, sequential: float, parallel: float):
+    print(f"{name}: {sequential * 1000:.1f} ms in the loading thread, "
+          f"{parallel * 1000:.1f} ms with a pool of {workers}, speedup {sequential / parallel:.2f}x")
+
+
+report(theme_path, measure_theme(0), measure_theme(workers))
+with tempfile.TemporaryDirectory() as directory:
+    images = write_images(directory, 16, 256)
+    report("16 images of 256x256", measure_images(directory, images, 0), measure_images(directory, images, workers))
+window.close()
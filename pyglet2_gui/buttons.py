@@ -6,6 +6,7 @@ from pyglet2_gui.core import Viewer
 from pyglet2_gui.mixins import FocusMixin, HighlightMixin
 from pyglet2_gui.theme import templates
 from pyglet2_gui.theme.theme import Theme
+from pyglet2_gui.text_metrics import text_metrics, get_font_key
 from typing import Any
 from collections.abc import Callable
 
@@ -100,6 +101,12 @@ class Button(TwoStateController, Viewer):
     def get_pressed_path(self) -> str:
         return 'down' if self.is_pressed else 'up'
 
+    def get_theme_paths(self) -> list[tuple[str, ...]]:
+        paths = [] if self._alternative_theme is not None else super().get_theme_paths()
+        if self._outline_path is not None:
+            paths.append(self.normalize_path(self._outline_path))
+        return paths
+
     def load_graphics(self):
         theme = self._alternative_theme.get('button') if self._alternative_theme is not None \
             else self.theme.get(self.get_path())
@@ -131,18 +138,19 @@ class Button(TwoStateController, Viewer):
         if self._label is not None:
             self._label.unload()
 
+    def _get_label_width(self) -> int:
+        return text_metrics.get_text_width(get_font_key(self._label.document), self.label)
+
     def compute_size(self) -> tuple[int, int]:
         # Treat the height of the label as ascent + descent
         if self._label is not None:
-            font = self._label.document.get_font()
+            metrics = text_metrics.get_document_metrics(self._label.document)
             if not self._width and not self._height:
-                height = font.ascent - font.descent
-                return self._button.get_needed_size(self._label.content_width, height)
+                return self._button.get_needed_size(self._get_label_width(), metrics.height)
             elif self._width and not self._height:
-                height = font.ascent - font.descent
-                return self._button.get_needed_size(self._width, height)
+                return self._button.get_needed_size(self._width, metrics.height)
             elif self._height and not self._width:
-                return self._button.get_needed_size(self._label.content_width, self._height)
+                return self._button.get_needed_size(self._get_label_width(), self._height)
             else:
                 return self._button.get_needed_size(self._width, self._height)
         else:
@@ -157,15 +165,15 @@ class Button(TwoStateController, Viewer):
         if self._label is not None:
             # centers the label in the middle of the button
             x, y, width, height = self._button.get_content_region()
-            font = self._label.document.get_font()
+            metrics = text_metrics.get_document_metrics(self._label.document)
             if self._align == HALIGN_CENTER:
-                _x = x + width / 2 - self._label.content_width / 2 + 1
+                _x = x + width / 2 - self._get_label_width() / 2 + 1
             else:
                 _x = x + 4
             if self._font_valign == VALIGN_BOTTOM:
-                _y = y + font.ascent / 2 + font.descent + 2
+                _y = y + metrics.ascent / 2 + metrics.descent + 2
             else:
-                _y = y + height / 2 - font.ascent / 2 - font.descent - 2
+                _y = y + height / 2 - metrics.ascent / 2 - metrics.descent - 2
             self._label.pos(_x, _y)
 
     def delete(self):
@@ -239,15 +247,14 @@ class Checkbox(Button):
                                 self.h)
 
         else:  # label goes on left
-            self._button.update(self.x + self._label.content_width + self._padding,
+            self._button.update(self.x + self._get_label_width() + self._padding,
                                 self.y + self.height / 2 - self.h / 2,
                                 self.w,
                                 self.h)
 
-        font = self._label.document.get_font()
-        height = font.ascent - font.descent
+        metrics = text_metrics.get_document_metrics(self._label.document)
         _x = self.x if self.align != HALIGN_RIGHT else self.x + self.w + self._padding
-        _y = self.y + self.height / 2 - height / 2 - font.descent
+        _y = self.y + self.height / 2 - metrics.height / 2 - metrics.descent
         self._label.position = (_x, _y, 0)
 
     def compute_size(self) -> tuple[int, int]:
@@ -260,9 +267,8 @@ class Checkbox(Button):
 
         # Treat the height of the label as ascent + descent
         if self._label is not None:
-            font = self._label.document.get_font()
-            height = font.ascent - font.descent
-            return self.w + self._padding + self._label.content_width, max(self.h, height)
+            metrics = text_metrics.get_document_metrics(self._label.document)
+            return self.w + self._padding + self._get_label_width(), max(self.h, metrics.height)
         else:
             return self.w + self._padding, self.h
 
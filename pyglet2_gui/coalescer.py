@@ -0,0 +1,45 @@
+from __future__ import annotations
+import pyglet
+from collections.abc import Callable
+from typing import Any
+
+
+class InputCoalescer:
+    """Merges the mouse motion and drag events that arrive within a frame into one event,
+    at the last position and with the accumulated dx and dy, dispatched on the next tick
+    of pyglet.clock (i.e. before the next draw).
+
+    Events are only merged with the pending one if they go to the same handler with the
+    same buttons and modifiers; otherwise the pending event is dispatched first. Any other
+    event must call flush before being dispatched, so that the merged events keep their
+    order with presses and releases.
+    """
+    _pending: tuple[Callable[..., Any], list] | None = None  # the handler and its arguments
+
+    def add(self, handler: Callable[..., Any], x: int, y: int, dx: int, dy: int, *args: int):
+        if self._pending is not None:
+            pending_handler, event = self._pending
+            if pending_handler == handler and tuple(event[4:]) == args:
+                event[0], event[1] = x, y
+                event[2] += dx
+                event[3] += dy
+                return
+            self.flush()
+        self._pending = (handler, [x, y, dx, dy, *args])
+        pyglet.clock.schedule_once(self._on_tick, 0)
+
+    def _on_tick(self, dt: float):
+        self.flush()
+
+    def flush(self) -> Any:
+        """Dispatches the pending event, if any, and returns the result of its handler.
+        """
+        if self._pending is None:
+            return None
+        (handler, event), self._pending = self._pending, None
+        pyglet.clock.unschedule(self._on_tick)
+        return handler(*event)
+
+    def delete(self):
+        self._pending = None
+        pyglet.clock.unschedule(self._on_tick)
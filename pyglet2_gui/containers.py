@@ -40,6 +40,9 @@ class Container(Viewer):
     def content(self) -> list:
         return self._content
 
+    def get_children(self) -> list[Viewer]:
+        return self._content
+
     def set_manager(self, manager: Manager):
         Viewer.set_manager(self, manager)
         for item in self._content:
@@ -367,13 +370,16 @@ class GridContainer(Container):
     def compute_size(self) -> tuple[int, int]:
         # calculates the size and the maximum widths and heights of
         # each row and column.
+        if self.is_culled:
+            return self.width, self.height
         row_index = 0
         for row in self._matrix:
             max_height = self.padding
             col_index = 0
             for item in row:
                 if item is not None:
-                    item.compute_size()
+                    if not item.is_culled:  # a culled item keeps its last size.
+                        item.compute_size()
                     width, height = item.width, item.height
                 else:
                     width = height = 0
@@ -1,4 +1,5 @@
 from __future__ import annotations
+import enum
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -50,6 +51,7 @@ class Rectangle:
 
 class Viewer(Rectangle, Managed):
     _is_loaded: bool = False
+    _is_culled: bool = False
     parent: Viewer | None = None
 
     def __init__(self, **kwargs):
@@ -60,16 +62,41 @@ class Viewer(Rectangle, Managed):
     def is_loaded(self) -> bool:
         return self._is_loaded
 
+    @property
+    def is_culled(self) -> bool:
+        return self._is_culled
+
     def is_expandable(self) -> False:
         return False
 
     def set_position(self, x: int, y: int):
         Rectangle.set_position(self, x, y)
-        self.layout()
+        if not self._is_culled:
+            self.layout()
 
     def get_path(self) -> str | dict[str] | tuple[str]:
         raise NotImplementedError
 
+    @staticmethod
+    def normalize_path(path: str | list[str] | tuple[str] | None) -> tuple[str, ...]:
+        if path is None:
+            return ()
+        if isinstance(path, str):
+            return path,
+        return tuple(path)
+
+    def get_theme_paths(self) -> list[tuple[str, ...]]:
+        """Returns the scopes of the theme the graphics of the viewer are loaded from, so that a
+        theme change only reloads the viewers it affects. () is the root scope.
+        """
+        try:
+            return [self.normalize_path(self.get_path())]
+        except NotImplementedError:
+            return []
+
+    def get_children(self) -> list[Viewer]:
+        return []
+
     def load(self):
         assert not self._is_loaded
         self._is_loaded = True
@@ -78,7 +105,30 @@ class Viewer(Rectangle, Managed):
     def unload(self):
         assert self._is_loaded
         self._is_loaded = False
+        if self._is_culled:
+            self._is_culled = False  # the graphics were unloaded when it was culled.
+        else:
+            self.unload_graphics()
+
+    def cull(self):
+        """Unloads the graphics of the viewer and its children while they are out of view,
+        e.g. scrolled out of a Scrollable. They keep their position and size, but are not
+        laid out until uncull.
+        """
+        if not self._is_loaded or self._is_culled:
+            return
+        self._is_culled = True
         self.unload_graphics()
+        for item in self.get_children():
+            item.cull()
+
+    def uncull(self):
+        """Loads the graphics of a culled viewer again. Its children stay culled, and it
+        must be laid out afterwards.
+        """
+        if self._is_culled:
+            self._is_culled = False
+            self.load_graphics()
 
     def reload(self):
         self.unload()
@@ -88,6 +138,14 @@ class Viewer(Rectangle, Managed):
         self.reload()
         self.reset_size()
 
+    def swap_graphics(self) -> bool:
+        """Reloads the graphics of the viewer, but not of its children, e.g. after a theme
+        change. Returns True if the viewer needs a relayout afterwards.
+        """
+        self.unload_graphics()
+        self.load_graphics()
+        return False
+
     def load_graphics(self):
         pass
 
@@ -101,6 +159,8 @@ class Viewer(Rectangle, Managed):
         return self.width, self.height
 
     def reset_size(self, reset_parent: bool = True):
+        if self._is_culled:
+            return  # keeps its size until it is in view again.
         width, height = self.compute_size()
 
         # if out size changes
@@ -128,8 +188,41 @@ class Viewer(Rectangle, Managed):
         pass
 
 
+class Capability(enum.IntFlag):
+    """The event handlers a Controller class defines, so that a ControllerManager dispatches
+    an event by testing a flag instead of looking the handler up.
+    """
+    KEY_PRESS = enum.auto()
+    KEY_RELEASE = enum.auto()
+    TEXT = enum.auto()
+    TEXT_MOTION = enum.auto()
+    TEXT_MOTION_SELECT = enum.auto()
+    MOUSE_MOTION = enum.auto()
+    MOUSE_PRESS = enum.auto()
+    MOUSE_RELEASE = enum.auto()
+    MOUSE_DRAG = enum.auto()
+    GAIN_FOCUS = enum.auto()
+    LOSE_FOCUS = enum.auto()
+    GAIN_HIGHLIGHT = enum.auto()
+    LOSE_HIGHLIGHT = enum.auto()
+
+    @classmethod
+    def of(cls, controller_class: type) -> Capability:
+        capabilities = cls(0)
+        for capability in cls:
+            if hasattr(controller_class, 'on_' + capability.name.lower()):
+                capabilities |= capability
+        return capabilities
+
+
 class Controller(Managed):
     opened: bool = False
+    # computed once per class: handlers set on an instance afterwards are not dispatched.
+    capabilities: Capability = Capability(0)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.capabilities = Capability.of(cls)
 
     def set_manager(self, manager: Manager):
         Managed.set_manager(self, manager)
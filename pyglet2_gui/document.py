@@ -1,3 +1,7 @@
+import bisect
+import re
+from array import array
+from collections.abc import Iterator
 import pyglet
 from typing import Any
 from pyglet2_gui.scrollbars import VScrollbar
@@ -7,10 +11,121 @@ from pyglet2_gui.controllers import Controller
 from pyglet2_gui.manager import Manager
 
 
+class DocumentIndex:
+    """Keeps an index of the line starts and of the trigrams of a pyglet document,
+    used to search it.
+
+    The line starts are updated on every insertion and deletion. The trigram index is
+    built on the first search and extended when text is appended to the end of the
+    document; any other edit discards it until the next search.
+    """
+    NGRAM: int = 3
+    _document: pyglet.text.document.AbstractDocument
+    _line_starts: list[int]  # position where each line (paragraph) of the document starts
+    _ngrams: dict[str, array] | None = None  # lowercase trigram -> ascending positions
+
+    def __init__(self, document: pyglet.text.document.AbstractDocument):
+        self._document = document
+        text = document.text
+        self._line_starts = [0]
+        self._line_starts.extend(match.end() for match in re.finditer('\n', text))
+        document.push_handlers(on_insert_text=self._on_insert_text,
+                               on_delete_text=self._on_delete_text)
+
+    @property
+    def line_count(self) -> int:
+        return len(self._line_starts)
+
+    def get_line(self, position: int) -> int:
+        """Returns the line (paragraph) the position is in, in O(log n).
+        """
+        return bisect.bisect_right(self._line_starts, position) - 1
+
+    def get_line_start(self, line: int) -> int:
+        return self._line_starts[line]
+
+    def _on_insert_text(self, start: int, text: str):
+        length = len(text)
+        index = bisect.bisect_right(self._line_starts, start)
+        new_starts = [start + match.end() for match in re.finditer('\n', text)]
+        self._line_starts[index:] = new_starts + [x + length for x in self._line_starts[index:]]
+
+        if self._ngrams is not None:
+            if start + length == len(self._document.text):
+                # appended text: only the trigrams that end inside it are new.
+                self._add_ngrams(max(start - self.NGRAM + 1, 0))
+            else:
+                self._ngrams = None
+
+    def _on_delete_text(self, start: int, end: int):
+        first = bisect.bisect_right(self._line_starts, start)
+        last = bisect.bisect_right(self._line_starts, end)
+        length = end - start
+        self._line_starts[first:] = [x - length for x in self._line_starts[last:]]
+        self._ngrams = None
+
+    def _add_ngrams(self, start: int):
+        text = self._document.text
+        ngrams = self._ngrams
+        size = self.NGRAM
+        for position in range(start, len(text) - size + 1):
+            key = text[position:position + size].lower()
+            positions = ngrams.get(key)
+            if positions is None:
+                positions = ngrams[key] = array('L')
+            positions.append(position)
+
+    def _candidates(self, query: str) -> array:
+        """Returns the positions of the rarest trigram of the query, shifted to where the
+        query would start.
+        """
+        if self._ngrams is None:
+            self._ngrams = {}
+            self._add_ngrams(0)
+        lowered = query.lower()
+        best = None
+        best_offset = 0
+        for offset in range(len(lowered) - self.NGRAM + 1):
+            positions = self._ngrams.get(lowered[offset:offset + self.NGRAM])
+            if positions is None:
+                return array('L')
+            if best is None or len(positions) < len(best):
+                best = positions
+                best_offset = offset
+        return array('L', (x - best_offset for x in best if x >= best_offset))
+
+    def find(self, query: str, match_case: bool = True, start: int = 0) -> Iterator[tuple[int, int]]:
+        """Yields the (start, end) ranges of the non-overlapping matches of the query,
+        in ascending order, starting from the position 'start'.
+        """
+        if not query:
+            return
+        text = self._document.text
+        pattern = re.compile(re.escape(query), 0 if match_case else re.IGNORECASE)
+        if len(query) < self.NGRAM:
+            for match in pattern.finditer(text, start):
+                yield match.start(), match.end()
+            return
+
+        end_of_last = start
+        for position in self._candidates(query):
+            if position < end_of_last:
+                continue
+            if pattern.match(text, position) is not None:
+                end_of_last = position + len(query)
+                yield position, end_of_last
+
+    def delete(self):
+        self._document.remove_handlers(on_insert_text=self._on_insert_text,
+                                       on_delete_text=self._on_delete_text)
+        self._ngrams = None
+
+
 class Document(Controller, Viewer):
     """Allows you to embed a document within the GUI, which includes a
     vertical scrollbar.
     """
+    THEME_ATTRIBUTES: tuple[str, ...] = ('color', 'font_name', 'font_size')  # the styles set from the theme
     _document: pyglet.text.document.AbstractDocument
     chat: bool
     max_height: int
@@ -25,7 +140,14 @@ class Document(Controller, Viewer):
     _scrollbar: VScrollbar | None = None
     set_document_style: bool = False
     first_time_load: bool = True
+    _culled_offset: int | None = None  # the scroll offset of the document when it was culled
     is_fixed_size: bool
+    _unstyled_ranges: list[tuple[int, int]]  # ranges of the document the theme defaults were not applied to
+    _user_ranges: dict[str, list[tuple[int, int]]]  # attribute -> ranges styled by the user, never restyled
+    _applied_style: dict[str, Any]  # the theme defaults applied on the last styling
+    _styling: bool = False  # the theme defaults are being applied
+    _index: DocumentIndex | None = None
+    _highlight_colors: set[tuple[int, int, int, int]]
 
     def __init__(self, document: pyglet.text.document.FormattedDocument | pyglet.text.document.AbstractDocument | str,
                  width: int = 0,
@@ -51,6 +173,19 @@ class Document(Controller, Viewer):
         self.content_width = width
         self.is_fixed_size = is_fixed_size
 
+        self._unstyled_ranges = [(0, len(self._document.text))] if self._document.text else []
+        self._user_ranges = {}
+        # the styles the document already has were set by the user.
+        for attr in self.THEME_ATTRIBUTES:
+            self._user_ranges[attr] = self._merge_ranges(
+                [(start, end) for start, end, value in
+                 self._document.get_style_runs(attr).ranges(0, len(self._document.text)) if value is not None])
+        self._applied_style = {}
+        self._highlight_colors = set()
+        self._document.push_handlers(on_insert_text=self._on_document_insert_text,
+                                     on_delete_text=self._on_document_delete_text,
+                                     on_style_text=self._on_document_style_text)
+
     def hit_test(self, x: int, y: int) -> bool:
         if self._content is not None:
             return Rectangle(x=self._content.x,
@@ -61,6 +196,7 @@ class Document(Controller, Viewer):
             return False
 
     def _load_scrollbar(self, height: int):
+        assert not self.is_culled
         if self._content.content_height > height:
             if self._scrollbar is None:
                 self._scrollbar = VScrollbar(self.max_height)
@@ -73,12 +209,20 @@ class Document(Controller, Viewer):
             self._scrollbar.unload()
             self._scrollbar = None
 
+    def get_theme_paths(self) -> list[tuple[str, ...]]:
+        return [(), ('document',), ('vscrollbar',)]
+
+    def swap_graphics(self) -> bool:
+        # the layout and the scrollbar are created again, so they must be laid out.
+        Viewer.swap_graphics(self)
+        return True
+
     def load_graphics(self):
         if self._bgcolor is True:
             self._bg = self.theme.get('document').get('image').generate(self.theme.get('document').get('gui_color'),
                                                                         **self.get_batch('background'))
 
-        if not self.set_document_style and not self.chat:
+        if not self.chat:
             self.do_set_document_style(self.manager)
         self._content = pyglet.text.layout.IncrementalTextLayout(self._document,
                                                                  self.content_width, self.max_height,
@@ -93,28 +237,211 @@ class Document(Controller, Viewer):
             self._scrollbar = None
 
     def do_set_document_style(self, dialog: Manager):
+        """Applies the theme defaults of the dialog to the document. Only the ranges
+        inserted since the last styling are styled, unless the theme values changed.
+        The styles set by the user (with set_style or the attributes of the inserted
+        text) are kept.
+        """
+        style = {'color': dialog.theme.get('font_color'),
+                 'font_name': dialog.theme.get('font_name'),
+                 'font_size': dialog.theme.get('font_size')}
+        if self._applied_style != style:
+            # the theme changed: everything styled with the old defaults is restyled.
+            self._unstyled_ranges = [(0, len(self._document.text))]
         self.set_document_style = True
-        # Check the style runs to make sure we don't stamp on anything
-        # set by the user
-        self._do_set_document_style('color', dialog.theme.get('font_color'))
-        self._do_set_document_style('font_name', dialog.theme.get('font_name'))
-        self._do_set_document_style('font_size', dialog.theme.get('font_size'))
-
-    def _do_set_document_style(self, attr: str, value: Any):
-        length = len(self._document.text)
-        runs = [(start, end, doc_value) for start, end, doc_value in
-                self._document.get_style_runs(attr).ranges(0, length)
-                if doc_value is not None]
-        if not runs:
-            terminator = len(self._document.text)
+        if not self._unstyled_ranges:
+            return
+
+        # the ranges styled by the user are skipped.
+        self._styling = True
+        try:
+            for start, end in self._unstyled_ranges:
+                for attr, value in style.items():
+                    self._do_set_document_style(attr, value, start, end)
+        finally:
+            self._styling = False
+        self._unstyled_ranges = []
+        self._applied_style = style
+
+    def invalidate_document_style(self):
+        """Marks the whole document to be restyled the next time its graphics are loaded,
+        e.g. after the theme changed.
+        """
+        self._unstyled_ranges = [(0, len(self._document.text))]
+
+    def _do_set_document_style(self, attr: str, value: Any, start: int = 0, end: int | None = None):
+        end = len(self._document.text) if end is None else end
+        for run_start, run_end in self._subtract_ranges([(start, end)], self._user_ranges.get(attr, [])):
+            self._document.set_style(run_start, run_end, {attr: value})
+
+    def set_user_style(self, start: int, end: int, attributes: dict[str, Any]):
+        """Marks the attributes of the range as set by the user: the theme defaults are
+        not applied to them anymore. A None value gives the attribute back to the theme.
+        """
+        for attr, value in attributes.items():
+            if attr not in self.THEME_ATTRIBUTES:
+                continue
+            ranges = self._subtract_ranges(self._user_ranges.get(attr, []), [(start, end)])
+            if value is not None:
+                ranges = self._merge_ranges(ranges + [(start, end)])
+            self._user_ranges[attr] = ranges
+            if value is None:
+                self._unstyled_ranges = self._merge_ranges(self._unstyled_ranges + [(start, end)])
+
+    def _on_document_style_text(self, start: int, end: int, attributes: dict[str, Any]):
+        if not self._styling:
+            self.set_user_style(start, end, attributes)
+
+    def _on_document_insert_text(self, start: int, text: str):
+        length = len(text)
+        ranges = [(start, start + length)]
+        for range_start, range_end in self._unstyled_ranges:
+            if range_start >= start:
+                ranges.append((range_start + length, range_end + length))
+            elif range_end >= start:
+                ranges.append((range_start, range_end + length))
+            else:
+                ranges.append((range_start, range_end))
+        self._unstyled_ranges = self._merge_ranges(ranges)
+
+        # as in pyglet's run lists, the inserted text takes the style of the character
+        # before it (or of the first one), so it is the user's if that one is.
+        for attr, user_ranges in self._user_ranges.items():
+            ranges = []
+            for range_start, range_end in user_ranges:
+                if range_start >= start and not (start == 0 and range_start == 0):
+                    ranges.append((range_start + length, range_end + length))
+                elif range_end >= start:
+                    ranges.append((range_start, range_end + length))
+                else:
+                    ranges.append((range_start, range_end))
+            self._user_ranges[attr] = ranges
+
+        # the attributes given to insert_text are not dispatched: they are the values
+        # of the inserted text that differ from the inherited ones.
+        if start > 0:
+            inherited_position = start - 1
+        elif start + length < len(self._document.text):
+            inherited_position = start + length
         else:
-            terminator = runs[0][0]
-        self._document.set_style(0, terminator, {attr: value})
+            inherited_position = None
+        for attr in self.THEME_ATTRIBUTES:
+            runs = self._document.get_style_runs(attr)
+            inherited = None if inherited_position is None else runs[inherited_position]
+            for run_start, run_end, value in runs.ranges(start, start + length):
+                if value is not None and value != inherited:
+                    self.set_user_style(run_start, run_end, {attr: value})
+
+    def _on_document_delete_text(self, start: int, end: int):
+        def shift(position: int) -> int:
+            if position <= start:
+                return position
+            return start if position < end else position - (end - start)
+
+        ranges = [(shift(range_start), shift(range_end)) for range_start, range_end in self._unstyled_ranges]
+        self._unstyled_ranges = self._merge_ranges([x for x in ranges if x[0] < x[1]])
+        for attr, user_ranges in self._user_ranges.items():
+            ranges = [(shift(range_start), shift(range_end)) for range_start, range_end in user_ranges]
+            self._user_ranges[attr] = self._merge_ranges([x for x in ranges if x[0] < x[1]])
+
+    @staticmethod
+    def _merge_ranges(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        merged = []
+        for start, end in sorted(ranges):
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+            elif start < end:
+                merged.append((start, end))
+        return merged
+
+    @staticmethod
+    def _subtract_ranges(ranges: list[tuple[int, int]], removed: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        result = []
+        for start, end in ranges:
+            for removed_start, removed_end in removed:
+                if removed_start >= end or removed_end <= start:
+                    continue
+                if removed_start > start:
+                    result.append((start, removed_start))
+                start = max(start, removed_end)
+                if start >= end:
+                    break
+            if start < end:
+                result.append((start, end))
+        return result
 
     def get_text(self) -> str:
         return self._document.text
 
+    @property
+    def index(self) -> DocumentIndex:
+        """The line and search index of the document, created on first use.
+        """
+        if self._index is None:
+            self._index = DocumentIndex(self._document)
+        return self._index
+
+    def find(self, query: str, match_case: bool = True, start: int = 0) -> Iterator[tuple[int, int]]:
+        """Yields the (start, end) ranges of the matches of the query in the document.
+        See DocumentIndex.find.
+        """
+        return self.index.find(query, match_case, start)
+
+    def scroll_to_position(self, position: int):
+        """Scrolls the document such that the paragraph containing the position is at the top.
+        """
+        if self._content is None or self._scrollbar is None or not self._content.lines:
+            return
+        paragraph = self.index.get_line(position)
+        start = self.index.get_line_start(paragraph)
+        # a paragraph is laid out in one line or more: its first line is never before the
+        # index of the paragraph, and is that line unless the text before it was wrapped.
+        lines = self._content.lines
+        number = min(paragraph, len(lines) - 1)
+        if lines[number].start != start:
+            number = min(bisect.bisect_left(lines, start, lo=number, key=lambda x: x.start), len(lines) - 1)
+        line = lines[number]
+        self._scrollbar.set_knob_offset(-(line.y + line.ascent))
+        self.layout()
+
+    def highlight(self, start: int, end: int, color: tuple[int, int, int, int] = (255, 255, 0, 96)):
+        """Highlights the range as a background color style run.
+        """
+        assert isinstance(self._document, pyglet.text.document.FormattedDocument), \
+            "Highlighting requires a FormattedDocument"
+        self._highlight_colors.add(tuple(color))
+        self._document.set_style(start, end, {'background_color': color})
+
+    def clear_highlights(self):
+        """Removes the background color of every highlighted range.
+        """
+        if not self._highlight_colors:
+            return
+        runs = [(start, end) for start, end, color in
+                self._document.get_style_runs('background_color').ranges(0, len(self._document.text))
+                if color is not None and tuple(color) in self._highlight_colors]
+        for start, end in runs:
+            self._document.set_style(start, end, {'background_color': None})
+        self._highlight_colors = set()
+
+    def cull(self):
+        if self.is_loaded and not self.is_culled and self._scrollbar is not None:
+            self._culled_offset = self._scrollbar.get_knob_pos()
+        Viewer.cull(self)
+
+    def uncull(self):
+        if not self.is_culled:
+            return
+        Viewer.uncull(self)
+        # the layout is new: its scrollbar is loaded and scrolled back to where it was.
+        self.compute_size()
+        if self._scrollbar is not None and self._culled_offset is not None:
+            self._scrollbar.set_knob_offset(self._culled_offset)
+        self._culled_offset = None
+
     def layout(self):
+        if self.is_culled:
+            return
         if self._bgcolor is True:
             self._bg.update(self.x, self.y, self.w1 + 2, self.h1)
         if self._scrollbar is not None:
@@ -130,6 +457,9 @@ class Document(Controller, Viewer):
         if self._scrollbar is not None:
             self._scrollbar.set_position(self.x + self.content_width + 2, self.y)
 
+    def scroll_layout(self):
+        self.layout()
+
     def on_gain_highlight(self):
         if self._scrollbar is not None:
             self.manager.set_wheel_target(self._scrollbar)
@@ -138,6 +468,8 @@ class Document(Controller, Viewer):
         self.manager.set_wheel_target(None)
 
     def compute_size(self) -> tuple[int, int]:
+        if self.is_culled:
+            return self.width, self.height  # the layout is deleted; it is measured again on uncull.
         if self.is_fixed_size or (self.max_height and self._content.content_height > self.max_height):
             height = self.max_height
         else:
@@ -160,9 +492,35 @@ class Document(Controller, Viewer):
 
     def set_text(self, text: str):
         self._document.text = text
+        if self.set_document_style and self.has_manager():
+            self.do_set_document_style(self.manager)
+        if self.is_culled:
+            return
+        self.compute_size()
+        self.layout()
+
+    def append_text(self, text: str, attributes: dict | None = None):
+        """Appends text to the end of the document. Only the appended text is
+        styled with the theme defaults, except for the given attributes.
+        """
+        start = len(self._document.text)
+        self._document.insert_text(start, text, attributes)
+        # the attributes not given are the theme's, not inherited from the text before.
+        attributes = attributes or {}
+        self.set_user_style(start, start + len(text), {attr: attributes.get(attr) for attr in self.THEME_ATTRIBUTES})
+        if self.set_document_style and self.has_manager():
+            self.do_set_document_style(self.manager)
+        if self.is_culled:
+            return
         self.compute_size()
         self.layout()
 
     def delete(self):
+        self._document.remove_handlers(on_insert_text=self._on_document_insert_text,
+                                       on_delete_text=self._on_document_delete_text,
+                                       on_style_text=self._on_document_style_text)
+        if self._index is not None:
+            self._index.delete()
+            self._index = None
         Controller.delete(self)
         Viewer.delete(self)
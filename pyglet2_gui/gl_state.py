@@ -0,0 +1,186 @@
+from __future__ import annotations
+import weakref
+from typing import Any
+import pyglet
+from pyglet import gl
+
+
+class GLStateCache:
+    """Shadow of the GL state set by the groups of the GUI, shared by all of them, so
+    that a state call is only issued when it changes something.
+
+    pyglet's own groups (e.g. the text layout groups) change the state without the cache,
+    so the state is forgotten whenever such a group can have run: the layer groups of
+    the managers and scrollables call invalidate on set_state and unset_state. Inside a
+    layer, the theme groups must be sorted after the text groups, which pyglet creates
+    with orders up to TEXT_GROUP_MAX_ORDER: ThemeTextureGroup asserts that its order is
+    above it. Then no text group runs between two theme groups, and consecutive theme
+    groups only bind their texture.
+
+    The calls are counted per frame of the windows of the managers: each on_draw of one
+    of them ends the frame.
+    """
+    _enabled: dict[int, bool]
+    _blend_func: tuple[int, int] | None = None
+    _texture: tuple[int, int] | None = None  # (target, id) bound to GL_TEXTURE0
+    _active_texture: int | None = None
+    _program: Any = None  # the program in use, or 0 after stop_program
+    _filtered: weakref.WeakKeyDictionary  # texture -> its mag filter
+    _windows: weakref.WeakSet  # the windows whose on_draw ends a frame
+    issued: int = 0  # calls issued in the current frame
+    skipped: int = 0  # calls skipped in the current frame
+    last_frame: tuple[int, int] = (0, 0)  # (issued, skipped) of the last complete frame
+
+    def __init__(self):
+        self._enabled = {}
+        self._filtered = weakref.WeakKeyDictionary()
+        self._windows = weakref.WeakSet()
+
+    def invalidate(self):
+        """Forgets the state, e.g. because a group outside of the cache may change it.
+        """
+        self._enabled.clear()
+        self._blend_func = self._texture = self._active_texture = self._program = None
+
+    def watch_window(self, window: pyglet.window.Window):
+        """Ends a frame on each on_draw of the window, e.g. the window of a manager.
+        """
+        if window not in self._windows:
+            self._windows.add(window)
+            window.push_handlers(on_draw=self._on_draw)
+
+    def _on_draw(self):
+        self.end_frame()
+
+    def end_frame(self):
+        """Keeps the counts of the frame that ended in last_frame and starts counting the next one.
+        """
+        self.last_frame = (self.issued, self.skipped)
+        self.issued = self.skipped = 0
+
+    def _count(self, changed: bool) -> bool:
+        if changed:
+            self.issued += 1
+        else:
+            self.skipped += 1
+        return changed
+
+    def enable(self, capability: int):
+        if self._count(self._enabled.get(capability) is not True):
+            gl.glEnable(capability)
+            self._enabled[capability] = True
+
+    def disable(self, capability: int):
+        if self._count(self._enabled.get(capability) is not False):
+            gl.glDisable(capability)
+            self._enabled[capability] = False
+
+    def blend_func(self, source: int, destination: int):
+        if self._count(self._blend_func != (source, destination)):
+            gl.glBlendFunc(source, destination)
+            self._blend_func = (source, destination)
+
+    def bind_texture(self, target: int, texture_id: int):
+        if self._count(self._active_texture != gl.GL_TEXTURE0):
+            gl.glActiveTexture(gl.GL_TEXTURE0)
+            self._active_texture = gl.GL_TEXTURE0
+        if self._count(self._texture != (target, texture_id)):
+            gl.glBindTexture(target, texture_id)
+            self._texture = (target, texture_id)
+
+    def use_program(self, program: pyglet.graphics.shader.ShaderProgram):
+        if self._count(self._program is not program):
+            program.use()
+            self._program = program
+
+    def stop_program(self):
+        if self._count(self._program != 0):
+            gl.glUseProgram(0)
+            self._program = 0
+
+    def set_texture_filter(self, texture: pyglet.image.Texture, mag_filter: int = gl.GL_NEAREST):
+        """Sets the magnification filter of the texture, once per texture. Regions share
+        the filter of the texture they belong to.
+        """
+        texture = getattr(texture, 'owner', None) or texture
+        if self._filtered.get(texture) == mag_filter:
+            return
+        self.bind_texture(texture.target, texture.id)
+        gl.glTexParameteri(texture.target, gl.GL_TEXTURE_MAG_FILTER, mag_filter)
+        self._filtered[texture] = mag_filter
+
+    def get_counts(self) -> dict[str, int]:
+        """Returns the state calls issued and skipped in the last complete frame.
+        """
+        return {'issued': self.last_frame[0], 'skipped': self.last_frame[1]}
+
+
+gl_state = GLStateCache()
+
+TEXT_GROUP_MAX_ORDER = 2  # the highest order of pyglet's text layout and decoration groups
+
+
+def intersect(a: tuple[int, int, int, int], b: tuple[int, int, int, int]) -> tuple[int, int, int, int]:
+    """Returns the intersection of two (x, y, width, height) rectangles; its size is 0 if
+    they do not overlap.
+    """
+    x, y = max(a[0], b[0]), max(a[1], b[1])
+    width = max(min(a[0] + a[2], b[0] + b[2]) - x, 0)
+    height = max(min(a[1] + a[3], b[1] + b[3]) - y, 0)
+    return x, y, width, height
+
+
+class ScissorStack:
+    """Per-manager stack of the scissor rectangles of nested scrollables. Each pushed
+    rectangle is intersected with the one below, and the scissor test state is tracked
+    here instead of being queried from GL. The scissor test is assumed to be disabled
+    when the manager starts drawing.
+
+    The rectangles are pushed where the scrollables were laid out, and are moved by the
+    translation of the manager to window coordinates.
+    """
+    _rects: list[tuple[int, int, int, int]]
+    translation: tuple[int, int] = (0, 0)
+    _scissor: tuple[int, int, int, int] | None = None  # the rectangle set in GL, None if disabled
+
+    def __init__(self):
+        self._rects = []
+
+    def push(self, x: int, y: int, width: int, height: int):
+        rect = (int(x) + self.translation[0], int(y) + self.translation[1], int(width), int(height))
+        if self._rects:
+            rect = intersect(self._rects[-1], rect)
+        self._rects.append(rect)
+        self._apply(rect)
+
+    def pop(self):
+        self._rects.pop()
+        self._apply(self._rects[-1] if self._rects else None)
+
+    def _apply(self, rect: tuple[int, int, int, int] | None):
+        if rect == self._scissor:
+            return
+        if rect is None:
+            gl.glDisable(gl.GL_SCISSOR_TEST)
+        else:
+            if self._scissor is None:
+                gl.glEnable(gl.GL_SCISSOR_TEST)
+            gl.glScissor(*rect)
+        self._scissor = rect
+
+    def reset(self):
+        self._rects.clear()
+        self._apply(None)
+
+
+class LayerGroup(pyglet.graphics.Group):
+    """A layer of a manager or a scrollable (panel, background, ...). Its children
+    include pyglet groups that change the GL state without the cache, so the cache is
+    invalidated around them.
+    """
+
+    def set_state(self):
+        gl_state.invalidate()
+
+    def unset_state(self):
+        gl_state.invalidate()
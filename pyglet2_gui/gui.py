@@ -6,6 +6,7 @@ from pyglet2_gui.theme.elements import TextureGraphicElement
 from pyglet2_gui.theme.theme import Theme
 from pyglet2_gui.theme.templates import TextureTemplate, FrameTextureGraphicElement
 from pyglet2_gui.override import Label as LabelOverride
+from pyglet2_gui.text_metrics import FontKey, text_metrics
 
 
 class Graphic(Viewer):
@@ -47,6 +48,12 @@ class Graphic(Viewer):
     def change_path(self, path: str | list[str] | tuple[str]):
         self._path = path
 
+    def get_theme_paths(self) -> list[tuple[str, ...]]:
+        paths = [] if self._alt_theme is not None or self.texture_tmp is not None else super().get_theme_paths()
+        if self._outline_path is not None:
+            paths.append(self.normalize_path(self._outline_path))
+        return paths
+
     def load_graphics(self):
         if self._alt_theme is not None:
             theme = self._alt_theme.get(self.get_path())
@@ -120,11 +127,14 @@ class Label(Viewer):
     multiline: bool
     w: int
     updated: bool = False
+    static: bool  # the text never changes and is baked into the manager's StaticTextLayer
+    _font_key: FontKey | None = None
 
     def __init__(self, text: str = "", bold: bool = False, italic: bool = False,
                  font_name: str = None, font_size: int = None, color: tuple[int, int, int, int] = None,
                  path: str | list[str] | tuple[str] | None = None, width: int = None, multiline: bool = False,
-                 opacity: float = 1.0):
+                 opacity: float = 1.0, static: bool = False):
+        assert not (static and multiline), "Only single line labels can be static"
         super().__init__()
         self.text = text
         self.bold = bold
@@ -136,6 +146,7 @@ class Label(Viewer):
         self.path = path
         self.multiline = multiline
         self.w = width
+        self.static = static
 
     @property
     def opacity(self) -> float:
@@ -158,6 +169,11 @@ class Label(Viewer):
             color = color[:3] + (self.alpha,)
         self.font_size = self.font_size or theme.get('font_size')
 
+        if self.static:
+            self._font_key = (self.font_name or theme.get('font_name'), self.font_size, self.bold, self.italic)
+            self.manager.static_text.add(self, self.text, self._font_key, color)
+            return
+
         self.label = LabelOverride(self.text,
                                    bold=self.bold,
                                    multiline=self.multiline,
@@ -170,16 +186,26 @@ class Label(Viewer):
                                    **self.get_batch('background'))
 
     def unload_graphics(self):
-        self.label.delete()
+        if self.static:
+            self.manager.static_text.remove(self)
+        else:
+            self.label.delete()
 
     def layout(self):
-        self.label.pos(self.x, self.y)
+        if self.static:
+            # anchored at the bottom, like the pyglet label
+            self.manager.static_text.move(self, self.x, self.y - text_metrics.get_metrics(self._font_key).descent)
+        else:
+            self.label.pos(self.x, self.y)
 
     def set_text(self, text: str):
         self.text = text
         self.refresh()
 
     def compute_size(self) -> tuple[int, int]:
+        if self.static:
+            return (text_metrics.get_text_width(self._font_key, self.text),
+                    text_metrics.get_metrics(self._font_key).height)
         return self.label.content_width, self.label.content_height
 
 
@@ -231,7 +257,10 @@ class Frame(Wrapper):
         self.content.set_position(x, y)
 
     def compute_size(self) -> tuple[int, int]:
-        self.content.compute_size()
+        if self.is_culled:
+            return self.width, self.height
+        if not self.content.is_culled:
+            self.content.compute_size()
         return self._frame.get_needed_size(self.content.width, self.content.height)
 
 
@@ -0,0 +1,47 @@
+from __future__ import annotations
+import pyglet
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .manager import ViewerManager
+
+
+class ManagerLayer:
+    """A layer of managers with its own batch, so that bringing a manager to the front
+    or deleting it only rebuilds and sorts the draw list of the layer, whatever the size
+    of the batch of the game. The layers are drawn after the game, in order:
+
+        layer = ManagerLayer()
+        manager = Manager(content, theme, window=window, layer=layer)
+        ...
+        game_batch.draw()
+        layer.draw()
+    """
+    batch: pyglet.graphics.Batch  # the batch of the managers of the layer
+    _managers: list[ViewerManager]
+
+    def __init__(self):
+        self.batch = pyglet.graphics.Batch()
+        self._managers = []
+
+    @property
+    def managers(self) -> list[ViewerManager]:
+        return self._managers
+
+    def add_manager(self, manager: ViewerManager):
+        assert manager not in self._managers
+        self._managers.append(manager)
+
+    def remove_manager(self, manager: ViewerManager):
+        self._managers.remove(manager)
+
+    def draw(self):
+        """Brings the baked graphics of the managers up to date, so that a manager is not
+        drawn stale on its first frame, and draws the batch of the layer.
+        """
+        for manager in self._managers:
+            manager.flush_graphics()
+        self.batch.draw()
+
+    def delete(self):
+        self._managers.clear()
@@ -1,11 +1,19 @@
 from __future__ import annotations
 import pyglet
 from pyglet import gl
+from pyglet.math import Mat4, Vec3
 
+from pyglet2_gui.coalescer import InputCoalescer
 from pyglet2_gui.constants import ANCHOR_CENTER, get_relative_point
-from pyglet2_gui.core import Rectangle, Controller, Viewer
+from pyglet2_gui.core import Rectangle, Capability, Controller, Viewer
 from pyglet2_gui.containers import Wrapper
-from pyglet2_gui.theme.theme import Theme
+from pyglet2_gui.gl_state import gl_state, LayerGroup, ScissorStack
+from pyglet2_gui.layers import ManagerLayer
+from pyglet2_gui.router import WindowRouter
+from pyglet2_gui.static_text import StaticTextLayer
+from pyglet2_gui.theme.arena import VertexArena
+from pyglet2_gui.theme.frame_batch import FrameGeometryBatch
+from pyglet2_gui.theme.theme import Theme, ThemeDiff
 from typing import Any
 from collections.abc import Callable
 from typing import TYPE_CHECKING
@@ -21,6 +29,12 @@ class ViewerManagerGroup(pyglet.graphics.Group):
     """
     _top_manager_order: int = 0
     own_order: int
+    vertex_arena: VertexArena | None = None  # where the theme elements of the manager allocate vertices
+    frame_geometry: FrameGeometryBatch | None = None  # computes the vertices of the manager's frames
+    scissor_stack: ScissorStack  # the clipping of the manager's scrollables
+    window: pyglet.window.Window | None = None  # the window whose view translates the manager
+    translation: tuple[int, int] = (0, 0)  # from where the manager was laid out to where it is drawn
+    _saved_view: Mat4 | None = None
 
     @classmethod
     def _get_next_top_order(cls):
@@ -32,6 +46,7 @@ class ViewerManagerGroup(pyglet.graphics.Group):
         """
         super().__init__(order=self._get_next_top_order(), parent=parent)
         self.own_order = self.order
+        self.scissor_stack = ScissorStack()
 
     def __eq__(self, other: ViewerManagerGroup) -> bool:
         """When compared with other ViewerManagerGroups, we'll return the own_order
@@ -61,16 +76,30 @@ class ViewerManagerGroup(pyglet.graphics.Group):
         """
         self.own_order = self._get_next_top_order()
 
+    def set_translation(self, x: int, y: int):
+        self.translation = (x, y)
+        self.scissor_stack.translation = (x, y)
+
     def set_state(self):
-        """Ensure that blending is set.
+        """Ensure that blending is set, and translate the view if the manager was moved.
         """
-        gl.glEnable(gl.GL_BLEND)
-        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+        gl_state.invalidate()
+        gl_state.enable(gl.GL_BLEND)
+        gl_state.blend_func(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+        if self.translation != (0, 0) and self.window is not None:
+            self._saved_view = self.window.view
+            self.window.view = self._saved_view @ Mat4.from_translation(Vec3(*self.translation, 0))
 
     def unset_state(self):
-        """Restore previous blending state.
+        """Restore previous blending state and view, and the program the theme groups left in use.
         """
-        gl.glDisable(gl.GL_BLEND)
+        gl_state.disable(gl.GL_BLEND)
+        gl_state.stop_program()
+        gl_state.invalidate()
+        self.scissor_stack.reset()
+        if self._saved_view is not None:
+            self.window.view = self._saved_view
+            self._saved_view = None
 
 
 class ViewerManager(Wrapper):
@@ -82,6 +111,9 @@ class ViewerManager(Wrapper):
     group: dict[str, pyglet.graphics.Group]
     screen: Rectangle
     _window: pyglet.window.Window | None
+    _router: WindowRouter | None = None  # dispatches the events of the window, if it has one
+    _static_texts: dict[pyglet.graphics.Group, StaticTextLayer]  # parent group -> the static labels drawn in it
+    _layer: ManagerLayer | None = None  # the layer whose batch the manager is drawn in
 
     def __init__(self, content: Viewer | Frame,
                  theme: Theme,
@@ -89,13 +121,23 @@ class ViewerManager(Wrapper):
                  batch: pyglet.graphics.Batch = None,
                  group: pyglet.graphics.Group = None,
                  anchor: tuple[int, int] = ANCHOR_CENTER,
-                 offset: tuple[int, int] = (0, 0)):
+                 offset: tuple[int, int] = (0, 0),
+                 vertex_arena: bool = False,
+                 batched_frames: bool = False,
+                 layer: ManagerLayer = None):
         super().__init__(content=content, anchor=anchor)
         assert isinstance(theme, dict)
         self._theme = theme
         self._manager = self
         self._offset = offset
-
+        self._static_texts = {}
+
+        if layer is not None:
+            # the z-order changes of the managers only resort the batch of their layer.
+            assert batch is None
+            batch = layer.batch
+            self._layer = layer
+            layer.add_manager(self)
         if batch is None:
             self._batch = pyglet.graphics.Batch()
             self._has_own_batch = True
@@ -104,10 +146,14 @@ class ViewerManager(Wrapper):
             self._has_own_batch = False
 
         self._root_group = ViewerManagerGroup(parent=group)
-        self.group = {'panel': pyglet.graphics.Group(order=10, parent=self.root_group),
-                      'background': pyglet.graphics.Group(order=20, parent=self.root_group),
-                      'highlight': pyglet.graphics.Group(order=25, parent=self.root_group),
-                      'foreground': pyglet.graphics.Group(order=30, parent=self.root_group)}
+        if vertex_arena:
+            self._root_group.vertex_arena = VertexArena(self._batch)
+        if batched_frames:  # requires numpy
+            self._root_group.frame_geometry = FrameGeometryBatch()
+        self.group = {'panel': LayerGroup(order=10, parent=self.root_group),
+                      'background': LayerGroup(order=20, parent=self.root_group),
+                      'highlight': LayerGroup(order=25, parent=self.root_group),
+                      'foreground': LayerGroup(order=30, parent=self.root_group)}
 
         self.content.set_manager(self)
         self.content.parent = self
@@ -125,15 +171,41 @@ class ViewerManager(Wrapper):
     def batch(self) -> pyglet.graphics.Batch:
         return self._batch
 
+    @property
+    def layer(self) -> ManagerLayer | None:
+        return self._layer
+
+    @property
+    def static_text(self) -> StaticTextLayer:
+        """The layer where the static labels of this manager are baked, created on first use.
+        """
+        return self.get_static_text(self.group['background'])
+
+    def get_static_text(self, group: pyglet.graphics.Group) -> StaticTextLayer:
+        """Returns the layer of the static labels drawn in the group, e.g. the group of a
+        Scrollable, so that they are clipped with it. All of them are flushed with the manager.
+        """
+        static_text = self._static_texts.get(group)
+        if static_text is None:
+            static_text = self._static_texts[group] = StaticTextLayer(self._batch, group)
+        return static_text
+
+    def release_static_text(self, group: pyglet.graphics.Group):
+        """Deletes the layer of the static labels of the group, once the group is not used.
+        """
+        static_text = self._static_texts.pop(group, None)
+        if static_text is not None:
+            static_text.delete()
+
     @property
     def window(self) -> pyglet.window.Window:
         return self._window
 
     @window.setter
     def window(self, window: pyglet.window.Window):
-        if self._window is not None:
-            self._window.remove_handlers(self)
+        self._remove_handlers()
         self._window = window
+        self._root_group.window = window
 
         if self._window is None:
             self.unload()
@@ -141,7 +213,12 @@ class ViewerManager(Wrapper):
         else:
             width, height = window.get_size()
             self.screen = Rectangle(width=width, height=height)
-            self._window.push_handlers(self)
+            gl_state.watch_window(window)
+            self._router = WindowRouter.get(window)
+            if self._router is not None:
+                self._router.add_manager(self)
+            else:
+                self._window.push_handlers(self)
 
         # make a top-down reset_size.
         self.reset_size(reset_parent=False)
@@ -149,6 +226,13 @@ class ViewerManager(Wrapper):
         # and set the new position.
         self.set_position(*self.get_position())
 
+    def _remove_handlers(self):
+        if self._router is not None:
+            self._router.remove_manager(self)
+            self._router = None
+        elif self._window is not None:
+            self._window.remove_handlers(self)
+
     @property
     def offset(self) -> tuple[int, int]:
         return self._offset
@@ -160,13 +244,61 @@ class ViewerManager(Wrapper):
         self._offset = offset
         self.set_position(*self.get_position())
 
+    @property
+    def translation(self) -> tuple[int, int]:
+        """The offset from where the manager was laid out (its position) to where it is drawn.
+        """
+        return self._root_group.translation
+
+    def to_layout(self, x: int, y: int) -> tuple[int, int]:
+        """Converts window coordinates to the coordinates the manager was laid out in.
+        """
+        return x - self._root_group.translation[0], y - self._root_group.translation[1]
+
+    def move_to(self, x: int, y: int):
+        """Moves the manager to (x, y) without laying it out again: it is drawn translated
+        from where it was laid out, and the events are translated back. Without a window,
+        whose view translates the manager, it is laid out.
+        """
+        if self._window is None:
+            self.set_position(x, y)
+        else:
+            self._root_group.set_translation(int(x - self.x), int(y - self.y))
+
     @Wrapper.theme.getter
     def theme(self) -> Wrapper.theme:
         return self._theme
 
     def update_theme(self, new_theme: Theme):
+        """Switches to another theme. Only the viewers that load their graphics from a scope
+        that differs between the themes are reloaded, and the layout is only recomputed when
+        a font, a padding or the size of an image changed.
+        """
+        diff = ThemeDiff.from_themes(self._theme, new_theme)
         self._theme = new_theme
-        self.refresh()
+        self.apply_theme_diff(diff)
+
+    def apply_theme_diff(self, diff: ThemeDiff):
+        relayout = False
+        swapped = []  # the reloaded viewers none of whose parents were reloaded
+        viewers = [(self, False)]
+        while viewers:
+            viewer, parent_swapped = viewers.pop()
+            change = diff.get_change(viewer.get_theme_paths())
+            # culled viewers load the new theme when they are in view again.
+            if change != ThemeDiff.UNCHANGED and viewer.is_loaded and not viewer.is_culled:
+                relayout = viewer.swap_graphics() or change == ThemeDiff.RELAYOUT or relayout
+                if not parent_swapped:
+                    swapped.append(viewer)
+                parent_swapped = True
+            viewers.extend([(x, parent_swapped) for x in viewer.get_children()])
+
+        if relayout:
+            self.reset_size()
+        else:
+            # same sizes: the new graphics only have to be placed where the old ones were.
+            for viewer in swapped:
+                viewer.layout()
 
     @Wrapper.anchor.setter
     def anchor(self, anchor: Wrapper.anchor):
@@ -189,6 +321,12 @@ class ViewerManager(Wrapper):
 
         return x, y
 
+    def layout(self):
+        self._root_group.set_translation(0, 0)
+        super().layout()
+        if self._root_group.frame_geometry is not None:
+            self._root_group.frame_geometry.flush()
+
     def reset_size(self, reset_parent: bool = True):
         # Manager never has parent and thus never reset_parent.
         super().reset_size(reset_parent=False)
@@ -197,31 +335,58 @@ class ViewerManager(Wrapper):
         if reset_parent:
             self.set_position(*self.get_position())
 
+    def flush_graphics(self):
+        """Rebuilds now the static labels and frames that were changed since the last draw.
+        Called before the batch of the manager is drawn.
+        """
+        for static_text in self._static_texts.values():
+            static_text.flush()
+        if self._root_group.frame_geometry is not None:
+            self._root_group.frame_geometry.flush()
+
     def draw(self):
         assert self._has_own_batch
+        self.flush_graphics()
         self._batch.draw()
 
     def pop_to_top(self):
         """Puts the manager on top of the other dialogs on the same batch (and window).
         - Pops the manager group to the top
-        - Puts the event handler on top of the event handler's stack of the window.
+        - Puts the event handler on top of the event handler's stack of the window,
+          or sorts the managers of its router.
         """
         self._root_group.pop_to_top()
         self._batch._draw_list_dirty = True  # forces resorting groups
-        if self._window is not None:
+        if self._router is not None:
+            self._router.sort()
+        elif self._window is not None:
             self._window.remove_handlers(self)
             self._window.push_handlers(self)
 
     def delete(self):
         Wrapper.delete(self)
+        if self._layer is not None:
+            self._layer.remove_manager(self)
+            self._layer = None
+        for static_text in self._static_texts.values():
+            static_text.delete()
+        self._static_texts.clear()
+        if self._root_group.vertex_arena is not None:
+            self._root_group.vertex_arena.delete()
+            self._root_group.vertex_arena = None
+        if self._root_group.frame_geometry is not None:
+            self._root_group.frame_geometry.delete()
+            self._root_group.frame_geometry = None
         if self._window is not None:
-            self._window.remove_handlers(self)
+            self._remove_handlers()
             self._window = None
+            self._root_group.window = None
         self._batch._draw_list_dirty = True  # forces resorting groups
 
 
 class ControllerManager:
     _controllers: list[Controller]  # list of controllers
+    _focus_ring: list[Controller]  # the focusable controllers, in the order of the controllers
     _hover: Controller | None = None  # the control that is being hovered (mouse inside)
     _focus: Controller | None = None  # the control that has the focus (accepts key strokes)
     wheel_target: Controller | None = None  # the primary control to receive wheel events.
@@ -229,6 +394,7 @@ class ControllerManager:
 
     def __init__(self):
         self._controllers = []
+        self._focus_ring = []
 
     @property
     def controllers(self) -> list[Controller]:
@@ -237,10 +403,14 @@ class ControllerManager:
     def add_controller(self, controller: Controller):
         assert controller not in self._controllers
         self._controllers.append(controller)
+        if controller.capabilities & Capability.GAIN_FOCUS:
+            self._focus_ring.append(controller)
 
     def remove_controller(self, controller: Controller):
         assert controller in self._controllers
         self._controllers.remove(controller)
+        if controller in self._focus_ring:
+            self._focus_ring.remove(controller)
         if self._hover == controller:
             self.set_hover(None)
         if self._focus == controller:
@@ -249,20 +419,22 @@ class ControllerManager:
     def set_next_focus(self, direction: int):
         assert direction in [-1, 1]
 
-        # all the focusable controllers
-        focusable = [x for x in self._controllers if hasattr(x, 'on_gain_focus')]
-        if not focusable:
+        # walks the ring from the focus; culled controllers are out of view, as in hit-testing.
+        ring = self._focus_ring
+        if self._focus is None or self._focus not in ring:
+            new_focus = next((x for x in ring if not getattr(x, 'is_culled', False)), None)
+            if new_focus is not None:
+                self.set_focus(new_focus)
             return
-        if len(focusable) == 1:
-            focusable.append(None)
-
-        if self._focus is not None and self._focus in focusable:
-            index = focusable.index(self._focus)
-        else:
-            index = 0 - direction
 
-        new_focus = focusable[(index + direction) % len(focusable)]
-        self.set_focus(new_focus)
+        start = ring.index(self._focus)
+        for step in range(1, len(ring)):
+            controller = ring[(start + step * direction) % len(ring)]
+            if not getattr(controller, 'is_culled', False):
+                self.set_focus(controller)
+                return
+        # the focus is the only focusable controller: it is toggled off.
+        self.set_focus(None)
 
     def on_key_press(self, symbol: int, modifiers: int) -> Any:
         # move between focusable controllers.
@@ -275,35 +447,35 @@ class ControllerManager:
             self.set_next_focus(direction)
             return True  # we only change focus on the manager we are in.
 
-        if self._focus is not None and hasattr(self._focus, 'on_key_press'):
+        if self._focus is not None and self._focus.capabilities & Capability.KEY_PRESS:
             return self._focus.on_key_press(symbol, modifiers)
 
     def on_key_release(self, symbol: int, modifiers: int) -> Any:
-        if self._focus is not None and hasattr(self._focus, 'on_key_release'):
+        if self._focus is not None and self._focus.capabilities & Capability.KEY_RELEASE:
             return self._focus.on_key_release(symbol, modifiers)
 
     def on_mouse_drag(self, x: int, y: int, dx: int, dy: int, buttons: int, modifiers: int) -> Any:
-        if self._focus is not None and hasattr(self._focus, 'on_mouse_drag'):
+        if self._focus is not None and self._focus.capabilities & Capability.MOUSE_DRAG:
             return self._focus.on_mouse_drag(x, y, dx, dy, buttons, modifiers)
 
     def on_mouse_motion(self, x: int, y: int, dx: int, dy: int) -> Any:
         new_hover = None
         for control in self._controllers:
-            if control.hit_test(x, y):
+            if not getattr(control, 'is_culled', False) and control.hit_test(x, y):
                 new_hover = control
                 break
         self.set_hover(new_hover)
 
-        if self._hover is not None and hasattr(self._hover, 'on_mouse_motion'):
+        if self._hover is not None and self._hover.capabilities & Capability.MOUSE_MOTION:
             return self._hover.on_mouse_motion(x, y, dx, dy)
 
     def on_mouse_press(self, x: int, y: int, button: int, modifiers: int) -> Any:
         self.set_focus(self._hover)
-        if self._focus and hasattr(self._focus, 'on_mouse_press'):
+        if self._focus and self._focus.capabilities & Capability.MOUSE_PRESS:
             return self._focus.on_mouse_press(x, y, button, modifiers)
 
     def on_mouse_release(self, x: int, y: int, button: int, modifiers: int) -> Any:
-        if self._focus is not None and hasattr(self._focus, 'on_mouse_release'):
+        if self._focus is not None and self._focus.capabilities & Capability.MOUSE_RELEASE:
             return self._focus.on_mouse_release(x, y, button, modifiers)
 
     def on_mouse_scroll(self, x: int, y: int, scroll_x: int, scroll_y: int) -> Any:
@@ -315,34 +487,34 @@ class ControllerManager:
             return False
 
     def on_text(self, text: str) -> Any:
-        if self._focus and text != '\r' and hasattr(self._focus, 'on_text'):
+        if self._focus and text != '\r' and self._focus.capabilities & Capability.TEXT:
             return self._focus.on_text(text)
 
     def on_text_motion(self, motion: int) -> Any:
-        if self._focus and hasattr(self._focus, 'on_text_motion'):
+        if self._focus and self._focus.capabilities & Capability.TEXT_MOTION:
             return self._focus.on_text_motion(motion)
 
     def on_text_motion_select(self, motion: int) -> Any:
-        if self._focus and hasattr(self._focus, 'on_text_motion_select'):
+        if self._focus and self._focus.capabilities & Capability.TEXT_MOTION_SELECT:
             return self._focus.on_text_motion_select(motion)
 
     def set_focus(self, focus: Controller | None):
         if self._focus == focus:
             return
-        if self._focus is not None and hasattr(self._focus, 'on_lose_focus'):
+        if self._focus is not None and self._focus.capabilities & Capability.LOSE_FOCUS:
             self._focus.on_lose_focus()
         self._focus = focus
-        if focus is not None and hasattr(self._focus, 'on_gain_focus'):
+        if focus is not None and self._focus.capabilities & Capability.GAIN_FOCUS:
             self._focus.on_gain_focus()
 
     def set_hover(self, hover: Controller | None):
         if self._hover == hover:
             return
 
-        if self._hover is not None and hasattr(self._hover, 'on_lose_highlight'):
+        if self._hover is not None and self._hover.capabilities & Capability.LOSE_HIGHLIGHT:
             self._hover.on_lose_highlight()
         self._hover = hover
-        if hover is not None and hasattr(self._hover, 'on_gain_highlight'):
+        if hover is not None and self._hover.capabilities & Capability.GAIN_HIGHLIGHT:
             hover.on_gain_highlight()
 
     def set_wheel_hint(self, control: Controller | None):
@@ -353,6 +525,7 @@ class ControllerManager:
 
     def delete(self):
         self._controllers.clear()
+        self._focus_ring.clear()
         self._focus = None
         self._hover = None
         self.wheel_hint = None
@@ -364,6 +537,7 @@ class Manager(ViewerManager, ControllerManager):
     _is_dragging: bool = False
     on_mouse_click: Callable[[int, int, int, int, bool], Any] | None
     on_mouse_unclick: Callable[[int, int, int, int, bool], Any] | None
+    input_coalescer: InputCoalescer | None = None  # merges the motion and drag events of a frame
 
     def __init__(self,
                  content: Viewer | Frame,
@@ -375,37 +549,72 @@ class Manager(ViewerManager, ControllerManager):
                  anchor: tuple[int, int] = ANCHOR_CENTER,
                  offset: tuple[int, int] = (0, 0),
                  on_mouse_click: Callable[[int, int, int, int, bool], Any] | None = None,
-                 on_mouse_unclick: Callable[[int, int, int, int, bool], Any] | None = None):
+                 on_mouse_unclick: Callable[[int, int, int, int, bool], Any] | None = None,
+                 vertex_arena: bool = False,
+                 batched_frames: bool = False,
+                 coalesce_input: bool = False,
+                 layer: ManagerLayer = None):
         ControllerManager.__init__(self)
         ViewerManager.__init__(self, content=content, theme=theme, window=window, batch=batch,
-                               group=group, anchor=anchor, offset=offset)
+                               group=group, anchor=anchor, offset=offset, vertex_arena=vertex_arena,
+                               batched_frames=batched_frames, layer=layer)
 
         self.is_movable = is_movable
         self.on_mouse_click = on_mouse_click
         self.on_mouse_unclick = on_mouse_unclick
+        if coalesce_input:
+            self.input_coalescer = InputCoalescer()
 
     def hit_test(self, x: int, y: int) -> bool:
         return self.is_inside(x, y)
 
+    def flush_input(self):
+        """Dispatches the motion or drag event being coalesced, if any.
+        """
+        if self.input_coalescer is not None:
+            self.input_coalescer.flush()
+
     def on_mouse_drag(self, x: int, y: int, dx: int, dy: int, buttons: int, modifiers: int) -> bool:
+        if self.input_coalescer is not None:
+            # the event is dispatched later, so whether it is handled is predicted.
+            self.input_coalescer.add(self._on_mouse_drag, x, y, dx, dy, buttons, modifiers)
+            if self._focus is not None and self._focus.capabilities & Capability.MOUSE_DRAG:
+                return True
+            return self.is_movable and self._is_dragging
+        return self._on_mouse_drag(x, y, dx, dy, buttons, modifiers)
+
+    def _on_mouse_drag(self, x: int, y: int, dx: int, dy: int, buttons: int, modifiers: int) -> bool:
+        x, y = self.to_layout(x, y)
         if not ControllerManager.on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
             if self.is_movable and self._is_dragging:
                 x, y = self._offset
                 self._offset = (int(x + dx), int(y + dy))
-                self.set_position(*self.get_position())
+                # only the offset changed: the manager is translated, not laid out.
+                self.move_to(*self.get_position())
                 return True
 
     def on_mouse_motion(self, x: int, y: int, dx: int, dy: int):
+        if self.input_coalescer is not None:
+            self.input_coalescer.add(self._on_mouse_motion, x, y, dx, dy)
+            if self.hit_test(*self.to_layout(x, y)):
+                return True
+            return
+        return self._on_mouse_motion(x, y, dx, dy)
+
+    def _on_mouse_motion(self, x: int, y: int, dx: int, dy: int):
+        x, y = self.to_layout(x, y)
         ControllerManager.on_mouse_motion(self, x, y, dx, dy)
         if self.hit_test(x, y):
             return True
 
     def on_mouse_press(self, x: int, y: int, button: int, modifiers: int) -> Any:
+        self.flush_input()
         for controller in self._controllers:
             if controller.opened:
                 controller.close()
-        retval = ControllerManager.on_mouse_press(self, x, y, button, modifiers)
-        if self.hit_test(x, y):
+        local_x, local_y = self.to_layout(x, y)
+        retval = ControllerManager.on_mouse_press(self, local_x, local_y, button, modifiers)
+        if self.hit_test(local_x, local_y):
             if not retval:
                 self._is_dragging = True
                 retval = True
@@ -414,11 +623,45 @@ class Manager(ViewerManager, ControllerManager):
 
         return retval
 
+    def on_outside_press(self, x: int, y: int, button: int, modifiers: int):
+        """Called by a WindowRouter when the press is outside of us, below us or nowhere.
+        """
+        self.flush_input()
+        for controller in self._controllers:
+            if controller.opened:
+                controller.close()
+        self.set_focus(None)
+
     def on_mouse_release(self, x: int, y: int, button: int, modifiers: int) -> Any:
+        self.flush_input()
         self._is_dragging = False
         if self.on_mouse_unclick:
             self.on_mouse_unclick(x, y, button, modifiers, True)
-        return ControllerManager.on_mouse_release(self, x, y, button, modifiers)
+        return ControllerManager.on_mouse_release(self, *self.to_layout(x, y), button, modifiers)
+
+    def on_mouse_scroll(self, x: int, y: int, scroll_x: int, scroll_y: int) -> Any:
+        self.flush_input()
+        return ControllerManager.on_mouse_scroll(self, *self.to_layout(x, y), scroll_x, scroll_y)
+
+    def on_key_press(self, symbol: int, modifiers: int) -> Any:
+        self.flush_input()
+        return ControllerManager.on_key_press(self, symbol, modifiers)
+
+    def on_key_release(self, symbol: int, modifiers: int) -> Any:
+        self.flush_input()
+        return ControllerManager.on_key_release(self, symbol, modifiers)
+
+    def on_text(self, text: str) -> Any:
+        self.flush_input()
+        return ControllerManager.on_text(self, text)
+
+    def on_text_motion(self, motion: int) -> Any:
+        self.flush_input()
+        return ControllerManager.on_text_motion(self, motion)
+
+    def on_text_motion_select(self, motion: int) -> Any:
+        self.flush_input()
+        return ControllerManager.on_text_motion_select(self, motion)
 
     def on_resize(self, width: int, height: int):
         """Update our knowledge of the window's width and height.
@@ -428,5 +671,7 @@ class Manager(ViewerManager, ControllerManager):
             self.set_position(*self.get_position())
 
     def delete(self):
+        if self.input_coalescer is not None:
+            self.input_coalescer.delete()
         ViewerManager.delete(self)
         ControllerManager.delete(self)
@@ -105,34 +105,40 @@ class Dropdown(Selector, HighlightedButton):
             self.close()
             return
 
-        # Compute the anchor point and location for the manager
+        # Compute the anchor point and location for the manager,
+        # in window coordinates since our manager may be translated.
         width, height = self.manager.window.get_size()
+        translation_x, translation_y = self.manager.translation
         if self.align == VALIGN_TOP:
             # Dropdown is at the top, pulldown appears below it
             anchor = ANCHOR_TOP_LEFT
-            x = self.x
-            y = -(height - self.y - 1)
+            x = self.x + translation_x
+            y = -(height - self.y - translation_y - 1)
         else:
             # Dropdown is at the bottom, pulldown appears above it
             anchor = ANCHOR_BOTTOM_LEFT
-            x = self.x
-            y = self.y + self.height + 1
+            x = self.x + translation_x
+            y = self.y + translation_y + self.height + 1
 
-        # we set the manager
+        # we set the manager, drawn with ours: in our layer, or else in our batch.
+        if self.manager.layer is not None:
+            drawing = {'layer': self.manager.layer}
+        else:
+            drawing = {'batch': self.manager.batch, 'group': self.manager.root_group.parent}
         self.opened = True
+        options = VerticalContainer(list(self._options.values()))
+        scrollable = Scrollable(options, height=self.max_height)
         self._pulldown_menu = \
             Manager(
                 Frame(
-                    Scrollable(
-                        VerticalContainer(list(self._options.values())),
-                        height=self.max_height, content_length=len(self._options)
-                    ),
+                    scrollable,
                     path=['dropdown', 'pulldown']
                 ),
-                window=self.manager.window, batch=self.manager.batch,
-                group=self.manager.root_group.parent, theme=self.manager.theme,
-                is_movable=False, anchor=anchor, offset=(x, y)
+                window=self.manager.window, theme=self.manager.theme,
+                is_movable=False, anchor=anchor, offset=(x, y), **drawing
             )
+        # the pulldown scrolls by rows, whose height is known once the options are loaded.
+        scrollable.set_content_length(options.content[0].height + options.padding)
 
     def delete(self):
         self.close()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+import weakref
+import pyglet
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .manager import ViewerManager
+
+
+class WindowRouter:
+    """Owns the managers of a window and dispatches the mouse events only to the topmost
+    manager under the mouse, instead of letting each event fall through the handler stack
+    of the window with every manager scanning its controllers.
+
+    Create it before the managers of the window, which then register to it instead of
+    pushing themselves on the window:
+
+        router = WindowRouter(window)
+        manager = Manager(content, theme, window=window)
+
+    The manager pressed keeps the drag and release events until the button is released.
+    The managers above it get on_outside_press, which closes their opened controllers, as
+    they saw the press before it fell through to the manager in the handler stack. Key
+    and text events go to the managers from the topmost one until one handles them.
+    """
+    _routers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()  # window -> its router
+    window: pyglet.window.Window
+    _managers: list[ViewerManager]  # sorted from the topmost
+    _hover: ViewerManager | None = None  # the manager under the mouse
+    _capture: ViewerManager | None = None  # the manager pressed, while the button is held
+
+    def __init__(self, window: pyglet.window.Window):
+        assert window not in self._routers
+        self.window = window
+        self._managers = []
+        self._routers[window] = self
+        window.push_handlers(self)
+
+    @classmethod
+    def get(cls, window: pyglet.window.Window) -> WindowRouter | None:
+        return cls._routers.get(window)
+
+    @property
+    def managers(self) -> list[ViewerManager]:
+        return self._managers
+
+    def add_manager(self, manager: ViewerManager):
+        assert manager not in self._managers
+        self._managers.append(manager)
+        self.sort()
+
+    def remove_manager(self, manager: ViewerManager):
+        assert manager in self._managers
+        self._managers.remove(manager)
+        if self._hover is manager:
+            self._hover = None
+        if self._capture is manager:
+            self._capture = None
+
+    def sort(self):
+        """Sorts the managers by their order, e.g. after one was popped to the top.
+        """
+        self._managers.sort(key=lambda manager: manager.root_group.own_order, reverse=True)
+
+    def get_manager_at(self, x: int, y: int) -> ViewerManager | None:
+        """Returns the topmost manager at the (window) coordinates.
+        """
+        for manager in self._managers:
+            if manager.is_inside(*manager.to_layout(x, y)):
+                return manager
+        return None
+
+    @staticmethod
+    def _dispatch(manager: ViewerManager | None, name: str, *args: Any) -> Any:
+        handler = getattr(manager, name, None)
+        if handler is not None:
+            return handler(*args)
+
+    def _dispatch_all(self, name: str, *args: Any) -> Any:
+        for manager in list(self._managers):
+            if self._dispatch(manager, name, *args):
+                return True
+
+    def _set_hover(self, manager: ViewerManager | None):
+        if self._hover is not manager and self._hover is not None:
+            self._dispatch(self._hover, 'set_hover', None)
+        self._hover = manager
+
+    def on_mouse_motion(self, x: int, y: int, dx: int, dy: int) -> Any:
+        manager = self.get_manager_at(x, y)
+        self._set_hover(manager)
+        return self._dispatch(manager, 'on_mouse_motion', x, y, dx, dy)
+
+    def on_mouse_press(self, x: int, y: int, button: int, modifiers: int) -> Any:
+        manager = self.get_manager_at(x, y)
+        self._set_hover(manager)
+        for other in list(self._managers):
+            if other is manager:
+                break
+            if other in self._managers:  # closing a controller can delete a popup manager.
+                self._dispatch(other, 'on_outside_press', x, y, button, modifiers)
+        if manager not in self._managers:
+            manager = None
+        self._capture = manager
+        return self._dispatch(manager, 'on_mouse_press', x, y, button, modifiers)
+
+    def on_mouse_drag(self, x: int, y: int, dx: int, dy: int, buttons: int, modifiers: int) -> Any:
+        return self._dispatch(self._capture, 'on_mouse_drag', x, y, dx, dy, buttons, modifiers)
+
+    def on_mouse_release(self, x: int, y: int, button: int, modifiers: int) -> Any:
+        manager, self._capture = self._capture, None
+        return self._dispatch(manager, 'on_mouse_release', x, y, button, modifiers)
+
+    def on_mouse_scroll(self, x: int, y: int, scroll_x: int, scroll_y: int) -> Any:
+        return self._dispatch(self.get_manager_at(x, y), 'on_mouse_scroll', x, y, scroll_x, scroll_y)
+
+    def on_key_press(self, symbol: int, modifiers: int) -> Any:
+        return self._dispatch_all('on_key_press', symbol, modifiers)
+
+    def on_key_release(self, symbol: int, modifiers: int) -> Any:
+        return self._dispatch_all('on_key_release', symbol, modifiers)
+
+    def on_text(self, text: str) -> Any:
+        return self._dispatch_all('on_text', text)
+
+    def on_text_motion(self, motion: int) -> Any:
+        return self._dispatch_all('on_text_motion', motion)
+
+    def on_text_motion_select(self, motion: int) -> Any:
+        return self._dispatch_all('on_text_motion_select', motion)
+
+    def on_resize(self, width: int, height: int):
+        # every manager keeps its anchor to the window; the event goes on to the window.
+        for manager in list(self._managers):
+            self._dispatch(manager, 'on_resize', width, height)
+
+    def delete(self):
+        self.window.remove_handlers(self)
+        self._routers.pop(self.window, None)
+        self._managers.clear()
+        self._hover = self._capture = None
@@ -1,42 +1,69 @@
 import pyglet
-from pyglet import gl
 from pyglet2_gui.core import Managed, Viewer
 from pyglet2_gui.manager import ControllerManager, Manager
 
 from pyglet2_gui.controllers import Controller
+from pyglet2_gui.gl_state import LayerGroup, ScissorStack, intersect
 from pyglet2_gui.containers import Wrapper
-from pyglet2_gui.scrollbars import HScrollbar, VScrollbar
+from pyglet2_gui.scrollbars import HScrollbar, VScrollbar, IMMEDIATE
+from pyglet2_gui.static_text import StaticTextLayer
 from pyglet2_gui.theme.theme import Theme
 from typing import Any
 
 
 class ScrollableGroup(pyglet.graphics.Group):
     """We restrict what's shown within a Scrollable by performing a scissor
-    test.
+    test, intersected with the ones of the Scrollables we are in.
     """
     x: int
     y: int
     width: int
     height: int
-    was_scissor_enabled: bool = False
+    _scissor_stack: ScissorStack | None = None
 
     def __init__(self, x: int, y: int, width: int, height: int, parent: Any = None):
         super().__init__(parent=parent)
         self.x, self.y, self.width, self.height = x, y, width, height
 
+    @property
+    def scissor_stack(self) -> ScissorStack:
+        """The scissor stack of our manager, or our own if we are not in a manager.
+        """
+        if self._scissor_stack is None:
+            group = self.parent
+            while group is not None and getattr(group, 'scissor_stack', None) is None:
+                group = group.parent
+            self._scissor_stack = group.scissor_stack if group is not None else ScissorStack()
+        return self._scissor_stack
+
+    def get_clip_rect(self) -> tuple[int, int, int, int]:
+        """Returns our region intersected with the regions of the ScrollableGroups we are in.
+        """
+        rect = (int(self.x), int(self.y), int(self.width), int(self.height))
+        group = self.parent
+        while group is not None:
+            if isinstance(group, ScrollableGroup):
+                rect = intersect(rect, (int(group.x), int(group.y), int(group.width), int(group.height)))
+            group = group.parent
+        return rect
+
+    def update_visibility(self):
+        """Hides our content from the batch when it is fully clipped by the Scrollables we are in.
+        """
+        _, _, width, height = self.get_clip_rect()
+        visible = width > 0 and height > 0
+        if self.visible != visible:
+            self.visible = visible
+
     def set_state(self):
         """Enables a scissor test on our region
         """
-        # gl.glPushAttrib(gl.GL_ENABLE_BIT | gl.GL_TRANSFORM_BIT | gl.GL_CURRENT_BIT)
-        self.was_scissor_enabled = gl.glIsEnabled(gl.GL_SCISSOR_TEST)
-        gl.glEnable(gl.GL_SCISSOR_TEST)
-        gl.glScissor(int(self.x), int(self.y), int(self.width), int(self.height))
+        self.scissor_stack.push(self.x, self.y, self.width, self.height)
 
     def unset_state(self):
-        """Disables the scissor test
+        """Restores the scissor test of the Scrollable we are in, if any
         """
-        if not self.was_scissor_enabled:
-            gl.glDisable(gl.GL_SCISSOR_TEST)
+        self.scissor_stack.pop()
 
 
 class Scrollable(Wrapper, Controller, ControllerManager):
@@ -49,14 +76,17 @@ class Scrollable(Wrapper, Controller, ControllerManager):
     _content_height: int = 0
     _content_x: int = 0
     _content_y: int = 0
-    _content_length: int  # the number of contents  todo fix
-    _theme: Theme | None = None
+    _content_length: int  # the height of the rows of the content, if they scroll by rows
+    cull: bool  # unload the graphics of the contents out of view
+    smooth_scrolling: bool  # the scrollbars scroll smoothly, once per frame
+    update_policy: str  # when the scrollbars lay out the content, see scrollbars.UPDATE_POLICIES
     batch: pyglet.graphics.Batch | None = None
     root_group: ScrollableGroup | None = None
     group: dict
 
     def __init__(self, content: Viewer = None, width: int = None, height: int = None, is_fixed_size: bool = False,
-                 content_length: int = None):
+                 content_length: int = None, cull: bool = False, smooth_scrolling: bool = False,
+                 update_policy: str = IMMEDIATE):
         if is_fixed_size:
             assert width is not None and height is not None
         Wrapper.__init__(self, content=content)
@@ -65,26 +95,62 @@ class Scrollable(Wrapper, Controller, ControllerManager):
         self.max_height = height
         self.is_fixed_size = is_fixed_size
         self._content_length = content_length
+        self.cull = cull
+        self.smooth_scrolling = smooth_scrolling
+        self.update_policy = update_policy
         self.group = {'panel': None, 'background': None, 'foreground': None, 'highlight': None}
 
     @Managed.theme.getter
     def theme(self) -> Theme:
-        return self._theme
+        # the theme of our manager, which can be switched after we were created.
+        return self.manager.theme
 
     def set_manager(self, manager: Manager):
         Controller.set_manager(self, manager)
-        self._theme = manager.theme
         self.batch = manager.batch
         self.root_group = ScrollableGroup(0, 0, self.width, self.height, parent=manager.group.get('foreground'))
         self.group.update({
-            'panel': pyglet.graphics.Group(order=10, parent=self.root_group),
-            'background': pyglet.graphics.Group(order=20, parent=self.root_group),
-            'foreground': pyglet.graphics.Group(order=30, parent=self.root_group),
-            'highlight': pyglet.graphics.Group(order=20, parent=self.root_group)
+            'panel': LayerGroup(order=10, parent=self.root_group),
+            'background': LayerGroup(order=20, parent=self.root_group),
+            'foreground': LayerGroup(order=30, parent=self.root_group),
+            'highlight': LayerGroup(order=20, parent=self.root_group)
         })
         self.content.set_manager(self)
         self.content.parent = self
 
+    @property
+    def static_text(self) -> StaticTextLayer:
+        """The layer of the static labels of our content, clipped with our group.
+        """
+        return self.get_static_text(self.group['background'])
+
+    def get_static_text(self, group: pyglet.graphics.Group) -> StaticTextLayer:
+        return self.manager.get_static_text(group)
+
+    def release_static_text(self, group: pyglet.graphics.Group):
+        self.manager.release_static_text(group)
+
+    def set_content_length(self, content_length: int | None):
+        """Sets the height of the rows of the content, e.g. once they are loaded and their
+        height is known. The vertical scrollbar snaps to multiples of it.
+        """
+        self._content_length = content_length
+        if self._vscrollbar is not None:
+            self._vscrollbar.step = content_length
+
+    def get_theme_paths(self) -> list[tuple[str, ...]]:
+        return [('hscrollbar',), ('vscrollbar',)]
+
+    def swap_graphics(self) -> bool:
+        # the scrollbars are loaded again when our size is computed.
+        Wrapper.swap_graphics(self)
+        return True
+
+    def unload(self):
+        Wrapper.unload(self)
+        # our content removed its static labels, and our groups are created again with our manager.
+        self.release_static_text(self.group['background'])
+
     def unload_graphics(self):
         Wrapper.unload_graphics(self)
         if self._hscrollbar is not None:
@@ -122,7 +188,8 @@ class Scrollable(Wrapper, Controller, ControllerManager):
         # we load a scrollbar
         if self.content.width > width:
             if self._hscrollbar is None:
-                self._hscrollbar = HScrollbar(width)
+                self._hscrollbar = HScrollbar(width, smooth=self.smooth_scrolling,
+                                              update_policy=self.update_policy)
                 self._hscrollbar.set_manager(self.manager)
                 self._hscrollbar.parent = self
                 self._hscrollbar.load()
@@ -133,7 +200,9 @@ class Scrollable(Wrapper, Controller, ControllerManager):
 
         if self.content.height > height:
             if self._vscrollbar is None:
-                self._vscrollbar = VScrollbar(height, content_length=self._content_length)
+                self._vscrollbar = VScrollbar(height, content_length=self._content_length,
+                                              smooth=self.smooth_scrolling,
+                                              update_policy=self.update_policy)
                 self._vscrollbar.set_manager(self.manager)
                 self._vscrollbar.parent = self
                 self._vscrollbar.load()
@@ -157,6 +226,7 @@ class Scrollable(Wrapper, Controller, ControllerManager):
         self.root_group.x, self.root_group.y = self.x - 1, y - 1
         self.root_group.width = self._content_width + 1
         self.root_group.height = self._content_height + 1
+        self.root_group.update_visibility()
 
         # Work out the content layout
         self._content_x, self._content_y = self.x, y
@@ -169,6 +239,38 @@ class Scrollable(Wrapper, Controller, ControllerManager):
             top += self._vscrollbar.get_knob_pos()
 
         self.content.set_position(left, top)
+        if self.cull:
+            self._update_culling(self.content, self.root_group.get_clip_rect())
+
+    def scroll_layout(self):
+        # the content is laid out by set_position, there is no need to lay it out first.
+        self.layout(load_wrapper=False)
+
+    def _update_culling(self, viewer: Viewer, region: tuple[int, int, int, int]):
+        """Culls the viewers entirely outside the region and restores the ones that came
+        back into it. Expandable viewers are never culled, since their parents expand
+        them, nor is the focused one.
+        """
+        _, _, width, height = intersect(region, (int(viewer.x), int(viewer.y), viewer.width, viewer.height))
+        if (width == 0 or height == 0) and not viewer.is_expandable() and not self._contains_focus(viewer):
+            viewer.cull()
+            return
+        if viewer.is_culled:
+            viewer.uncull()
+            viewer.layout()
+        for item in viewer.get_children():
+            self._update_culling(item, region)
+
+    def _contains_focus(self, viewer: Viewer) -> bool:
+        if self._focus is None:
+            return False
+        items = [viewer]
+        while items:
+            item = items.pop()
+            if item is self._focus:
+                return True
+            items.extend(item.get_children())
+        return False
 
     def on_gain_highlight(self):
         if self._hscrollbar is not None:
@@ -182,7 +284,12 @@ class Scrollable(Wrapper, Controller, ControllerManager):
         self.manager.set_wheel_hint(None)
 
     def compute_size(self) -> tuple[int, int]:
-        content_width, content_height = self.content.compute_size()
+        if self.is_culled:
+            return self.width, self.height
+        if self.content.is_culled:
+            content_width, content_height = self.content.width, self.content.height
+        else:
+            content_width, content_height = self.content.compute_size()
 
         width = min(self.max_width or content_width, content_width)
         height = min(self.max_height or content_height, content_height)
@@ -1,26 +1,166 @@
+from __future__ import annotations
+import math
+import pyglet
 from pyglet2_gui.sliders import Slider
 
 
+class ScrollIntegrator:
+    """Moves the knobs of the smooth scrollbars once per frame, from a single function
+    scheduled with pyglet.clock while any of them is moving.
+    """
+    _scrollbars: list[ScrollBar]
+    _scheduled: bool = False
+
+    def __init__(self):
+        self._scrollbars = []
+
+    def add(self, scrollbar: ScrollBar):
+        if scrollbar not in self._scrollbars:
+            self._scrollbars.append(scrollbar)
+        if not self._scheduled:
+            self._scheduled = True
+            pyglet.clock.schedule(self._step)
+
+    def remove(self, scrollbar: ScrollBar):
+        if scrollbar in self._scrollbars:
+            self._scrollbars.remove(scrollbar)
+
+    def _step(self, dt: float):
+        for scrollbar in list(self._scrollbars):
+            if not scrollbar.advance(dt):
+                self._scrollbars.remove(scrollbar)
+        if not self._scrollbars:
+            self._scheduled = False
+            pyglet.clock.unschedule(self._step)
+
+
+scroll_integrator = ScrollIntegrator()
+
+
+IMMEDIATE = 'immediate'  # the parent is laid out on every event that moves the knob
+PER_FRAME = 'per_frame'  # the events of a frame are coalesced into one layout of the parent
+ON_RELEASE = 'on_release'  # as per_frame, but a drag only lays out the parent when the mouse is released
+UPDATE_POLICIES = (IMMEDIATE, PER_FRAME, ON_RELEASE)
+
+
 class ScrollBar(Slider):
     """An abstract scrollbar with a specific knob size to be set.
+
+    The knob follows the events, and the parent is laid out through its scroll_layout
+    according to the update_policy. If a step is known (e.g. the height of the rows of
+    the content), the knob snaps to it, so that the parent is only laid out when the
+    content moves by a row.
+
+    If smooth, wheel events add velocity to the knob and drag events set its target;
+    the scroll integrator then moves the knob and lays out the parent once per frame,
+    whatever the number of events, and the velocity decays with the friction.
     """
     _knob_size: float = 0.0  # the size of the knob. Value runs from [_knob_size/2, 1 - _knob_size/2]
-    _scrolled: int = 0  # a cumulative value of scroll to avoid re-layout on every scroll event
+    update_policy: str = IMMEDIATE
+    step: int | None = None  # the content scrolls by multiples of step pixels
+    _dragging: bool = False
+    _pending: bool = False  # a layout of the parent is scheduled
+    smooth: bool = False
+    friction: float = 8.0  # decay rate of the velocity, per second
+    _velocity: float = 0.0  # knob positions per second
+    _drag_target: float | None = None  # the knob position of the last drag event of the frame
 
     def set_size(self, width: int, height: int):
         self.width = width
         self.height = height
 
-    def re_layout(self):
+    def set_update_policy(self, update_policy: str):
+        assert update_policy in UPDATE_POLICIES
+        self.update_policy = update_policy
+
+    def _get_length(self) -> int:
+        """Returns the length of the bar in pixels. To be subclassed.
+        """
+        raise NotImplementedError
+
+    def scroll_by(self, delta: float):
+        """Moves the knob by delta (in knob positions), smoothly if the scrollbar is smooth.
+        """
+        if self.smooth:
+            # the velocity decays exponentially, so the knob travels velocity / friction.
+            self._velocity += delta * self.friction
+            scroll_integrator.add(self)
+        else:
+            self.move_knob(self._knob_pos() + delta)
+
+    def drag_to(self, pos: float):
+        """Moves the knob to pos, on the next frame if the scrollbar is smooth.
+        """
+        if self.smooth:
+            self._drag_target = pos
+            self._velocity = 0.0
+            scroll_integrator.add(self)
+        else:
+            self.move_knob(pos)
+
+    def move_knob(self, pos: float):
+        """Moves the knob to pos, snapped to the step, and requests a layout of the parent
+        if the content moved.
+        """
+        offset = self.get_knob_pos()
+        self.set_knob_pos(pos)
+        self._snap_to_step()
+        if self.get_knob_pos() != offset:
+            self.request_update()
+
+    def _snap_to_step(self):
+        # the end of the bar is kept, even if the content does not end on a step.
+        if self.step and self._knob_pos() < 1 - self._knob_size / 2:
+            self.set_knob_offset(round(self.get_knob_pos() / self.step) * self.step)
+
+    def advance(self, dt: float) -> bool:
+        """Moves the knob by the time step. Called by the scroll integrator once per frame;
+        returns whether the knob is still moving.
+        """
+        if not self.is_loaded:
+            self._velocity, self._drag_target = 0.0, None
+            return False
+        start = self._knob_pos()
+        pos = start if self._drag_target is None else self._drag_target
+        self._drag_target = None
+        decay = math.exp(-self.friction * dt)
+        pos += self._velocity / self.friction * (1 - decay)
+        self._velocity *= decay
+
+        self.set_knob_pos(pos)
+        # stop when less than half a pixel remains, or at the ends of the bar.
+        if abs(self._velocity / self.friction) * self._get_length() < 0.5 or self._knob_pos() == start:
+            self._velocity = 0.0
+            self._snap_to_step()
         self.layout()
-        # when we do layout, we ask the parent also re_layout since
-        # a scrollbar defines the content region.
-        if self._scrolled > 4:
-            try:
-                self.parent.layout(load_wrapper=False)
-            except:
-                self.parent.layout()
-            self._scrolled = 0
+        # the integrator already runs once per frame; only on_release defers the layout.
+        if self.update_policy == ON_RELEASE and self._dragging:
+            self._pending = True
+        else:
+            self.update_parent()
+        return self._velocity != 0.0
+
+    def request_update(self):
+        """Moves the knob and lays out the parent now or later, depending on the update policy.
+        """
+        self.layout()
+        if self.update_policy == IMMEDIATE:
+            self.update_parent()
+        elif self.update_policy == ON_RELEASE and self._dragging:
+            self._pending = True  # on_mouse_release lays out the parent.
+        elif not self._pending:
+            self._pending = True
+            pyglet.clock.schedule_once(self.update_parent, 0)
+
+    def update_parent(self, dt: float = None):
+        """Lays out the parent to the position of the knob, since a scrollbar defines its
+        content region.
+        """
+        if self._pending:
+            self._pending = False
+            pyglet.clock.unschedule(self.update_parent)
+        if self.parent is not None and self.is_loaded:
+            self.parent.scroll_layout()
 
     def _get_bar_region(self) -> tuple[int, int, int, int]:
         """Returns the area of the space where the knob moves (x, y, width, height)
@@ -50,17 +190,37 @@ class ScrollBar(Slider):
         if self.manager is not None:
             self.manager.set_wheel_target(self)
 
+    def on_mouse_press(self, x: int, y: int, button: int, modifiers: int) -> True:
+        self._dragging = True
+        return Slider.on_mouse_press(self, x, y, button, modifiers)
+
+    def on_mouse_release(self, x: int, y: int, button: int, modifiers: int):
+        self._dragging = False
+        if self._pending:
+            self.update_parent()
+
     def on_lose_focus(self):
-        self._scrolled = 0
+        if self._dragging:
+            self.on_mouse_release(0, 0, 0, 0)
         if self.manager is not None:
             self.manager.set_wheel_target(None)
 
+    def delete(self):
+        scroll_integrator.remove(self)
+        pyglet.clock.unschedule(self.update_parent)
+        super().delete()
+
 
 class HScrollbar(ScrollBar):
     PATH: str = 'hscrollbar'
 
-    def __init__(self, width: int):
+    def __init__(self, width: int, smooth: bool = False, update_policy: str = IMMEDIATE):
         super().__init__(width=width, height=0)
+        self.smooth = smooth
+        self.set_update_policy(update_policy)
+
+    def _get_length(self) -> int:
+        return self.width
 
     def _get_knob_region(self) -> tuple[int, int, int, int]:
         return int(self.x + (self._knob_pos() - self._knob_size / 2) * self.width), \
@@ -69,6 +229,11 @@ class HScrollbar(ScrollBar):
     def get_knob_pos(self) -> int:
         return int((self._knob_pos() - self._knob_size / 2) * self.width / self._knob_size)
 
+    def set_knob_offset(self, offset: int):
+        """The inverse of get_knob_pos: scrolls such that the content is shifted by offset.
+        """
+        self.set_knob_pos(offset * self._knob_size / self.width + self._knob_size / 2)
+
     def load_graphics(self):
         super().load_graphics()
         self.height = self._bar.height
@@ -78,16 +243,11 @@ class HScrollbar(ScrollBar):
 
         absolute_distance = float(x - bar_x)
         relative_distance = absolute_distance / bar_width
-
-        self.set_knob_pos(relative_distance)
-        self._scrolled = 10
-        self.re_layout()
+        self.drag_to(relative_distance)
         return True
 
     def on_mouse_scroll(self, x: int, y: int, scroll_x: int, scroll_y: int) -> True:
-        self._scrolled += abs(scroll_x)
-        self.set_knob_pos(self._knob_pos() - float(scroll_x) / self.width)
-        self.re_layout()
+        self.scroll_by(-float(scroll_x) / self.width)
         return True
 
     def set_knob_size(self, width: int, max_width: int):
@@ -102,12 +262,28 @@ class HScrollbar(ScrollBar):
 
 class VScrollbar(ScrollBar):
     PATH: str = 'vscrollbar'
-    _last: int = 0
-    _content_length: int | None  # the number of contents
 
-    def __init__(self, height: int, content_length: int = None):
+    def __init__(self, height: int, content_length: int = None, smooth: bool = False,
+                 update_policy: str = IMMEDIATE):
+        """Create a VScrollbar
+
+        :Parameters:
+            'height' : int
+                height of the bar
+            'content_length' : int
+                height of the rows of the content, if any. The content scrolls by rows
+            'smooth' : bool
+                scroll smoothly, once per frame
+            'update_policy' : str
+                when the parent is laid out: 'immediate', 'per_frame' or 'on_release'
+        """
         super().__init__(width=0, height=height)
-        self._content_length = content_length
+        self.step = content_length
+        self.smooth = smooth
+        self.set_update_policy(update_policy)
+
+    def _get_length(self) -> int:
+        return self.height
 
     def _get_knob_region(self) -> tuple[int, int, int, int]:
         top = self.y + self.height
@@ -119,6 +295,11 @@ class VScrollbar(ScrollBar):
         # height/_knob_size = max_height by "set_knob_size()".
         return int((self._knob_pos() - self._knob_size / 2) * self.height / self._knob_size)
 
+    def set_knob_offset(self, offset: int):
+        """The inverse of get_knob_pos: scrolls such that the content is shifted by offset.
+        """
+        self.set_knob_pos(offset * self._knob_size / self.height + self._knob_size / 2)
+
     def load_graphics(self):
         super().load_graphics()
         self.width = self._bar.width
@@ -127,24 +308,11 @@ class VScrollbar(ScrollBar):
         bar_x, bar_y, bar_width, bar_height = self._bar.get_content_region()
         absolute_distance = float(y - bar_y)
         relative_distance = absolute_distance / bar_height
-        # print relative_distance
-        if self._content_length is not None:
-            if int(absolute_distance // self._content_length) != self._last:
-                self.set_knob_pos(1 - relative_distance)
-                self._scrolled += abs(dy)
-                self.re_layout()
-                self._last = int(absolute_distance // self._content_length)
-        else:
-            self.set_knob_pos(1 - relative_distance)
-            self._scrolled += abs(dy)
-            self.re_layout()
+        self.drag_to(1 - relative_distance)
         return True
 
     def on_mouse_scroll(self, x: int, y: int, scroll_x: int, scroll_y: int) -> True:
-        scroll_y = -scroll_y * 15
-        self._scrolled += abs(scroll_y)
-        self.set_knob_pos(self._knob_pos() + float(scroll_y) / self.height)
-        self.re_layout()
+        self.scroll_by(-scroll_y * 15.0 / self.height)
         return True
 
     def set_knob_size(self, height: int, max_height: int):
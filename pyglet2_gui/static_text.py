@@ -0,0 +1,156 @@
+from __future__ import annotations
+from typing import Any
+import pyglet
+from pyglet import gl
+from pyglet2_gui.text_metrics import FontKey
+
+
+class StaticText:
+    """The glyph quads of one static label, relative to its baseline origin.
+    """
+    font: pyglet.font.base.Font
+    color: tuple[int, int, int, int]
+    x: int = 0
+    y: int = 0  # the baseline
+    quads: dict[pyglet.image.Texture, tuple[list[float], list[float]]]  # texture -> (vertices, tex_coords)
+    ranges: list[tuple[Any, int, int]]  # (vertex list, first vertex, vertex count) in the baked lists
+
+    def __init__(self, text: str, font_key: FontKey, color: tuple[int, int, int, int]):
+        font_name, font_size, bold, italic = font_key
+        self.font = pyglet.font.load(font_name, font_size, bold=bold, italic=italic)
+        self.color = tuple(color)
+        self.quads = {}
+        self.ranges = []
+
+        x = 0
+        for glyph in self.font.get_glyphs(text):
+            vertices, tex_coords = self.quads.setdefault(glyph.owner, ([], []))
+            v0, v1, v2, v3 = glyph.vertices
+            vertices.extend(map(round, [v0 + x, v1, 0, v2 + x, v1, 0, v2 + x, v3, 0, v0 + x, v3, 0]))
+            tex_coords.extend(glyph.tex_coords)
+            x += glyph.advance
+
+
+class StaticTextLayer:
+    """Bakes the glyphs of the static labels of a Manager into a few shared vertex lists,
+    one per glyph texture, instead of a vertex list per label.
+
+    The lists are rebuilt once per frame at most, and only after a label was added or
+    removed. Moving a label only rewrites the translation of its vertices.
+    """
+    _batch: pyglet.graphics.Batch
+    _group: pyglet.graphics.Group
+    _program: pyglet.graphics.shader.ShaderProgram
+    _has_visible: bool  # the layout shader multiplies the positions by a visible attribute (pyglet 2.0.12+)
+    _texts: dict[Any, StaticText]  # owner -> its glyphs
+    _groups: dict[pyglet.image.Texture, pyglet.text.layout.TextLayoutGroup]
+    _vertex_lists: list
+    _dirty: bool = False
+
+    def __init__(self, batch: pyglet.graphics.Batch, group: pyglet.graphics.Group):
+        """Create a StaticTextLayer.
+
+        :Parameters:
+            'batch' : '~pyglet.graphics.Batch'
+                the batch where the text is drawn
+            'group' : '~pyglet.graphics.Group'
+                the parent group of the text
+        """
+        self._batch = batch
+        self._group = group
+        self._program = pyglet.text.layout.get_default_layout_shader()
+        self._has_visible = 'visible' in self._program.attributes
+        self._texts = {}
+        self._groups = {}
+        self._vertex_lists = []
+
+    def add(self, owner: Any, text: str, font_key: FontKey, color: tuple[int, int, int, int]):
+        assert owner not in self._texts
+        self._texts[owner] = StaticText(text, font_key, color)
+        self._mark_dirty()
+
+    def remove(self, owner: Any):
+        del self._texts[owner]
+        self._mark_dirty()
+
+    def move(self, owner: Any, x: int, y: int):
+        """Moves the baseline origin of the owner's text to (x, y).
+        """
+        static_text = self._texts[owner]
+        x, y = round(x), round(y)
+        if (static_text.x, static_text.y) == (x, y):
+            return
+        static_text.x, static_text.y = x, y
+        if self._dirty:
+            return  # the rebuild uses the new position.
+        for vertex_list, start, count in static_text.ranges:
+            vertex_list.translation[start * 3:(start + count) * 3] = (x, y, 0) * count
+
+    def _mark_dirty(self):
+        if not self._dirty:
+            self._dirty = True
+            pyglet.clock.schedule_once(self._on_rebuild, 0)
+
+    def _on_rebuild(self, dt: float):
+        self.flush()
+
+    def flush(self):
+        """Rebuilds the vertex lists now if a label was added or removed.
+        """
+        if not self._dirty:
+            return
+        pyglet.clock.unschedule(self._on_rebuild)
+        self._dirty = False
+
+        for vertex_list in self._vertex_lists:
+            vertex_list.delete()
+        self._vertex_lists = []
+
+        textures = {}
+        for static_text in self._texts.values():
+            static_text.ranges = []
+            for texture in static_text.quads:
+                textures.setdefault(texture, []).append(static_text)
+
+        for texture, texts in textures.items():
+            group = self._groups.get(texture)
+            if group is None:
+                group = self._groups[texture] = pyglet.text.layout.TextLayoutGroup(texture, self._program,
+                                                                                   order=1, parent=self._group)
+            vertices, tex_coords, colors, translations, indices = [], [], [], [], []
+            ranges = []
+            count = 0
+            for static_text in texts:
+                text_vertices, text_tex_coords = static_text.quads[texture]
+                text_count = len(text_vertices) // 3
+                for quad in range(count, count + text_count, 4):
+                    indices.extend([quad, quad + 1, quad + 2, quad, quad + 2, quad + 3])
+                vertices.extend(text_vertices)
+                tex_coords.extend(text_tex_coords)
+                colors.extend(static_text.color * text_count)
+                translations.extend((static_text.x, static_text.y, 0) * text_count)
+                ranges.append((static_text, count, text_count))
+                count += text_count
+
+            # as in pyglet's layouts: the attribute defaults to 0, which hides the glyphs.
+            visible = {'visible': ('f', (1,) * count)} if self._has_visible else {}
+            vertex_list = self._program.vertex_list_indexed(count, gl.GL_TRIANGLES, indices, self._batch, group,
+                                                            position=('f', vertices),
+                                                            colors=('Bn', colors),
+                                                            tex_coords=('f', tex_coords),
+                                                            translation=('f', translations),
+                                                            rotation=('f', (0,) * count),
+                                                            anchor=('f', (0, 0) * count),
+                                                            **visible)
+            self._vertex_lists.append(vertex_list)
+            for static_text, start, text_count in ranges:
+                static_text.ranges.append((vertex_list, start, text_count))
+
+    def delete(self):
+        pyglet.clock.unschedule(self._on_rebuild)
+        self._dirty = False
+        for vertex_list in self._vertex_lists:
+            vertex_list.delete()
+        self._vertex_lists = []
+        self._texts.clear()
+        self._groups.clear()
@@ -4,6 +4,7 @@ from pyglet2_gui.override import InputLabel
 from pyglet2_gui.core import Viewer
 from pyglet2_gui.theme.elements import FrameTextureGraphicElement
 from pyglet2_gui.theme.theme import Theme
+from pyglet2_gui.text_metrics import text_metrics
 from typing import Any
 from collections.abc import Callable
 
@@ -127,17 +128,14 @@ class TextInput(FocusMixin, Viewer):
 
     def _compute_needed_size(self) -> tuple[int, int]:
         # Calculate the needed size based on the font size
-        font = self._document.get_font(0)
+        metrics = text_metrics.get_document_metrics(self._document)
 
         if self.w1 is None:
-            glyphs = font.get_glyphs('A_')
-            width = max([x.width for x in glyphs])
-            needed_width = self._length * width - 2 * self._padding
+            needed_width = self._length * metrics.glyph_width - 2 * self._padding
         else:
             needed_width = self.w1
         if self.h1 is None:
-            height = font.ascent - font.descent
-            needed_height = height + 2 * self._padding
+            needed_height = metrics.height + 2 * self._padding
         else:
             needed_height = self.h1
         return needed_width, needed_height
@@ -0,0 +1,95 @@
+from __future__ import annotations
+from collections import OrderedDict
+from typing import NamedTuple
+import pyglet
+
+FontKey = tuple[str | None, float | None, bool, bool]  # (font_name, font_size, bold, italic)
+
+
+class FontMetrics(NamedTuple):
+    ascent: int
+    descent: int
+    height: int  # ascent - descent
+    glyph_width: int  # the widest of 'A' and '_', used to size text inputs
+
+
+def get_font_key(document: pyglet.text.document.AbstractDocument, position: int = 0) -> FontKey:
+    """Returns the key of the font used at the position of the document.
+    """
+    return (document.get_style('font_name', position),
+            document.get_style('font_size', position),
+            bool(document.get_style('bold', position)),
+            bool(document.get_style('italic', position)))
+
+
+class TextMetricsCache:
+    """LRU cache of font metrics, keyed by font, and of the width of text runs, keyed
+    by font and text. Widgets sharing a font reuse the measurements instead of loading
+    the font and laying out its glyphs again.
+    """
+    max_fonts: int
+    max_widths: int
+    _metrics: OrderedDict[FontKey, FontMetrics]
+    _widths: OrderedDict[tuple[FontKey, str], int]
+    hits: int = 0
+    misses: int = 0
+
+    def __init__(self, max_fonts: int = 64, max_widths: int = 4096):
+        self.max_fonts = max_fonts
+        self.max_widths = max_widths
+        self._metrics = OrderedDict()
+        self._widths = OrderedDict()
+
+    @staticmethod
+    def _load_font(key: FontKey) -> pyglet.font.base.Font:
+        font_name, font_size, bold, italic = key
+        return pyglet.font.load(font_name, font_size, bold=bold, italic=italic)
+
+    def get_metrics(self, key: FontKey) -> FontMetrics:
+        metrics = self._metrics.get(key)
+        if metrics is not None:
+            self._metrics.move_to_end(key)
+            self.hits += 1
+            return metrics
+
+        self.misses += 1
+        font = self._load_font(key)
+        metrics = FontMetrics(ascent=font.ascent,
+                              descent=font.descent,
+                              height=font.ascent - font.descent,
+                              glyph_width=max([x.width for x in font.get_glyphs('A_')]))
+        self._metrics[key] = metrics
+        if len(self._metrics) > self.max_fonts:
+            self._metrics.popitem(last=False)
+        return metrics
+
+    def get_text_width(self, key: FontKey, text: str) -> int:
+        """Returns the width of a single line of text, as laid out by a pyglet Label: the
+        label lays its glyphs out one advance after the other, without kerning, so its
+        content_width is the sum of their advances.
+        """
+        width = self._widths.get((key, text))
+        if width is not None:
+            self._widths.move_to_end((key, text))
+            self.hits += 1
+            return width
+
+        self.misses += 1
+        width = sum([x.advance for x in self._load_font(key).get_glyphs(text)])
+        self._widths[(key, text)] = width
+        if len(self._widths) > self.max_widths:
+            self._widths.popitem(last=False)
+        return width
+
+    def get_document_metrics(self, document: pyglet.text.document.AbstractDocument,
+                             position: int = 0) -> FontMetrics:
+        return self.get_metrics(get_font_key(document, position))
+
+    def clear(self):
+        self._metrics.clear()
+        self._widths.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+text_metrics = TextMetricsCache()  # shared by all the widgets
@@ -0,0 +1,316 @@
+from __future__ import annotations
+import mmap
+import os
+import threading
+from array import array
+from typing import BinaryIO
+import pyglet
+from pyglet2_gui.core import Viewer, Rectangle
+from pyglet2_gui.controllers import Controller
+from pyglet2_gui.scrollbars import VScrollbar
+
+
+class LargeTextView(Controller, Viewer):
+    """Displays a (possibly huge and growing) text file, e.g. a log.
+
+    The file is memory-mapped and an index with the offset of every line is built
+    in a background thread. Only the lines visible in the view are decoded and
+    laid out; the rest is navigated with a vertical scrollbar.
+    """
+    _path: str
+    _file: BinaryIO | None = None
+    _mmap: mmap.mmap | None = None
+    _size: int = 0  # the size of the mapped file
+    _line_starts: array  # offset in the file where each line starts
+    _indexed_size: int = 0  # the bytes of the file that were indexed
+    _index_lock: threading.Lock
+    _index_thread: threading.Thread | None = None
+    _index_changed: bool = False
+    _stop_indexing: threading.Event
+    _document: pyglet.text.document.UnformattedDocument | None = None
+    _content: pyglet.text.layout.TextLayout | None = None
+    _scrollbar: VScrollbar | None = None
+    _line_height: int = 0
+    _top_line: int = 0
+    _at_bottom: bool = False
+    encoding: str
+    font_name: str | None
+    font_size: int | None
+    font_color: tuple[int, int, int, int] | None
+    max_line_length: int
+    content_width: int
+    follow: bool
+    poll_interval: float
+
+    def __init__(self, path: str,
+                 width: int = 400,
+                 height: int = 300,
+                 font_name: str | None = None,
+                 font_size: int | None = None,
+                 font_color: tuple[int, int, int, int] | None = None,
+                 encoding: str = 'utf-8',
+                 max_line_length: int = 512,
+                 follow: bool = False,
+                 poll_interval: float = 0.25):
+        """Create a LargeTextView.
+
+        :Parameters:
+            'path' : str
+                the path of the text file
+            'width' : int
+                width of the view
+            'height' : int
+                height of the view
+            'font_name' : str
+                font of the text. Defaults to the theme's font
+            'font_size' : int
+                size of the text. Defaults to the theme's font size
+            'font_color' : tuple[int, int, int, int]
+                color of the text. Defaults to the theme's font color
+            'encoding' : str
+                encoding of the file
+            'max_line_length' : int
+                characters of a line that are displayed; longer lines are cut
+            'follow' : bool
+                if True, the view watches the file size and shows the lines appended to it,
+                staying at the bottom while the view is scrolled to the bottom
+            'poll_interval' : float
+                seconds between checks of the index progress and the file size
+        """
+        Viewer.__init__(self, width=width, height=height)
+        Controller.__init__(self)
+        self._path = path
+        self.font_name = font_name
+        self.font_size = font_size
+        self.font_color = font_color
+        self.encoding = encoding
+        self.max_line_length = max_line_length
+        self.content_width = width
+        self.follow = follow
+        self.poll_interval = poll_interval
+
+        self._line_starts = array('Q', [0])
+        self._index_lock = threading.Lock()
+        self._stop_indexing = threading.Event()
+        self._open()
+
+    @property
+    def line_count(self) -> int:
+        """The number of lines indexed so far.
+        """
+        with self._index_lock:
+            return len(self._line_starts)
+
+    def is_indexing(self) -> bool:
+        return self._index_thread is not None and self._index_thread.is_alive()
+
+    def _open(self):
+        self._file = open(self._path, 'rb')
+        self._remap()
+
+    def _remap(self):
+        """Maps the current size of the file and starts indexing what was not indexed yet.
+        Must not be called while the index thread runs.
+        """
+        assert not self.is_indexing()
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self._indexed_size:
+            # the file was truncated (e.g. a rotated log); start over.
+            with self._index_lock:
+                self._line_starts = array('Q', [0])
+                self._indexed_size = 0
+                self._index_changed = True
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._size = size
+        if size == 0:  # an empty file cannot be mapped.
+            return
+        self._mmap = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+        if self._indexed_size < size:
+            self._index_thread = threading.Thread(target=self._build_index,
+                                                  args=(self._mmap, self._indexed_size, size),
+                                                  daemon=True)
+            self._index_thread.start()
+
+    def _build_index(self, mapped: mmap.mmap, start: int, end: int):
+        """Finds the start of every line in mapped[start:end]. Runs in the index thread.
+        """
+        chunk = array('Q')
+        position = start
+        while not self._stop_indexing.is_set():
+            newline = mapped.find(b'\n', position, end)
+            if newline == -1:
+                break
+            position = newline + 1
+            chunk.append(position)
+            if len(chunk) >= 65536:
+                with self._index_lock:
+                    self._line_starts.extend(chunk)
+                    self._index_changed = True
+                chunk = array('Q')
+        with self._index_lock:
+            self._line_starts.extend(chunk)
+            self._indexed_size = end
+            self._index_changed = True
+
+    def get_lines(self, first: int, count: int) -> list[str]:
+        """Decodes 'count' lines starting from the line 'first'.
+        """
+        if self._mmap is None:
+            return []
+        with self._index_lock:
+            starts = self._line_starts[first:first + count + 1]
+            end_of_index = self._indexed_size
+        lines = []
+        for index in range(min(count, len(starts))):
+            start = starts[index]
+            end = starts[index + 1] if index + 1 < len(starts) else end_of_index
+            end = min(end, start + self.max_line_length * 4)  # at most 4 bytes per character
+            line = self._mmap[start:end].decode(self.encoding, errors='replace')
+            lines.append(line.rstrip('\r\n')[:self.max_line_length])
+        return lines
+
+    def _visible_line_count(self) -> int:
+        return max(int(self.height // self._line_height), 1)
+
+    def _max_top_line(self) -> int:
+        return max(self.line_count - self._visible_line_count(), 0)
+
+    def hit_test(self, x: int, y: int) -> bool:
+        return Rectangle(x=self.x, y=self.y, width=self.content_width, height=self.height).is_inside(x, y)
+
+    def get_theme_paths(self) -> list[tuple[str, ...]]:
+        return [(), ('vscrollbar',)]
+
+    def swap_graphics(self) -> bool:
+        # the layout and the scrollbar are created again, so they must be laid out.
+        Viewer.swap_graphics(self)
+        return True
+
+    def load_graphics(self):
+        font_name = self.font_name or self.theme.get('font_name')
+        font_size = self.font_size or self.theme.get('font_size')
+        font = pyglet.font.load(font_name, font_size)
+        self._line_height = font.ascent - font.descent
+
+        self._document = pyglet.text.document.UnformattedDocument('')
+        self._document.set_style(0, 0, dict(color=self.font_color or self.theme.get('font_color'),
+                                            font_name=font_name,
+                                            font_size=font_size))
+        self._content = pyglet.text.layout.TextLayout(self._document, self.content_width, self.height,
+                                                      multiline=True, wrap_lines=False,
+                                                      **self.get_batch('foreground'))
+        self._content.anchor_y = 'top'
+        pyglet.clock.schedule_interval(self._poll, self.poll_interval)
+
+    def unload_graphics(self):
+        pyglet.clock.unschedule(self._poll)
+        self._content.delete()
+        self._content = None
+        self._document = None
+        if self._scrollbar is not None:
+            self._scrollbar.unload()
+            self._scrollbar = None
+
+    def _load_scrollbar(self):
+        content_height = self.line_count * self._line_height
+        if content_height > self.height:
+            if self._scrollbar is None:
+                self._scrollbar = VScrollbar(self.height)
+                self._scrollbar.set_manager(self.manager)
+                self._scrollbar.parent = self
+                self._scrollbar.load()
+                self._scrollbar.set_knob_size(self.height, content_height)
+                self._scrollbar.set_knob_pos(0)
+            else:
+                self._scrollbar.set_knob_size(self.height, content_height)
+        elif self._scrollbar is not None:
+            self._scrollbar.unload()
+            self._scrollbar = None
+
+    def _poll(self, dt: float):
+        """Checks the progress of the index and, when following, the size of the file.
+        """
+        if self.follow and not self.is_indexing() and \
+                os.fstat(self._file.fileno()).st_size != self._size:
+            self._remap()
+
+        with self._index_lock:
+            changed = self._index_changed
+            self._index_changed = False
+        if changed:
+            at_bottom = self._at_bottom
+            self.reset_size()
+            if self.follow and at_bottom:
+                self.scroll_to_line(self._max_top_line())
+
+    def scroll_to_line(self, line: int):
+        """Scrolls the view such that 'line' is the first visible line.
+        """
+        line = max(min(line, self._max_top_line()), 0)
+        if self._scrollbar is not None:
+            self._scrollbar.set_knob_offset(line * self._line_height)
+        self._top_line = line
+        self.layout()
+
+    def uncull(self):
+        if not self.is_culled:
+            return
+        Viewer.uncull(self)
+        # the layout is new: its scrollbar is loaded and scrolled back to the top line.
+        self.compute_size()
+        if self._scrollbar is not None:
+            self._scrollbar.set_knob_offset(self._top_line * self._line_height)
+
+    def layout(self):
+        if self.is_culled:
+            return
+        if self._scrollbar is not None:
+            self._scrollbar.set_position(self.x + self.content_width, self.y)
+            self._top_line = min(self._scrollbar.get_knob_pos() // self._line_height, self._max_top_line())
+        else:
+            self._top_line = 0
+        self._at_bottom = self._top_line >= self._max_top_line()
+
+        self._content.begin_update()
+        self._document.text = '\n'.join(self.get_lines(self._top_line, self._visible_line_count()))
+        self._content.x = self.x
+        self._content.y = self.y + self.height
+        self._content.end_update()
+
+    def scroll_layout(self):
+        self.layout()
+
+    def on_gain_highlight(self):
+        if self._scrollbar is not None:
+            self.manager.set_wheel_target(self._scrollbar)
+
+    def on_lose_highlight(self):
+        self.manager.set_wheel_target(None)
+
+    def compute_size(self) -> tuple[int, int]:
+        if self.is_culled:
+            return self.width, self.height
+        self._load_scrollbar()
+        if self._scrollbar is not None:
+            self._scrollbar.compute_size()
+            return self.content_width + self._scrollbar.width, self.height
+        return self.content_width, self.height
+
+    def reset_size(self, reset_parent: bool = True):
+        Viewer.reset_size(self, reset_parent)
+        if self._scrollbar is not None:
+            self._scrollbar.reset_size(reset_parent=False)
+
+    def delete(self):
+        self._stop_indexing.set()
+        if self._index_thread is not None:
+            self._index_thread.join()
+            self._index_thread = None
+        Controller.delete(self)
+        Viewer.delete(self)
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
@@ -0,0 +1,248 @@
+from __future__ import annotations
+from collections.abc import Sequence
+import pyglet
+from pyglet import gl
+
+
+def get_attribute_buffer(vertex_list: pyglet.graphics.vertexdomain.VertexList, name: str):
+    """Returns the buffer of an attribute of the domain of the vertex list. Its set_region
+    takes (start, count, data) in vertices on all the pyglet 2.0 versions.
+    """
+    domain = vertex_list.domain
+    if hasattr(domain, 'attrib_name_buffers'):  # pyglet 2.0.16+: the attributes have no buffer
+        return domain.attrib_name_buffers[name]
+    return domain.attribute_names[name].buffer
+
+
+def map_buffer_region(buffer, start: int, count: int) -> Sequence:
+    """Returns the data of 'count' vertices of the buffer as an array that is uploaded with
+    the buffer when it is written, like the attributes of a vertex list.
+    """
+    region = buffer.get_region(start, count)
+    if hasattr(buffer, 'invalidate_region'):  # pyglet 2.0.15+: the region is the array
+        buffer.invalidate_region(start, count)
+        return region
+    region.invalidate()
+    return region.array
+
+
+def get_vertex_location(vertex_list: pyglet.graphics.vertexdomain.VertexList | ArenaSlot,
+                        name: str) -> tuple[object, int]:
+    """Returns the buffer of an attribute of a vertex list or arena slot, and the index of
+    its first vertex in that buffer.
+    """
+    if isinstance(vertex_list, ArenaSlot):
+        return vertex_list.get_location(name)
+    return get_attribute_buffer(vertex_list, name), vertex_list.start
+
+
+class ArenaSlot:
+    """A fixed number of vertices sub-allocated from an ArenaPool. It has the same
+    set_attribute_data and delete methods as a pyglet vertex list.
+    """
+    _pool: ArenaPool | None
+    block: ArenaBlock
+    index: int  # slot index within the block
+
+    def __init__(self, pool: ArenaPool, block: ArenaBlock, index: int):
+        self._pool = pool
+        self.block = block
+        self.index = index
+
+    def set_attribute_data(self, name: str, data: Sequence):
+        self._pool.write(self, name, data)
+
+    def get_location(self, name: str) -> tuple[object, int]:
+        """Returns the buffer of the attribute and the index of the first vertex of the slot in it.
+        """
+        vertex_list = self.block.vertex_list
+        return get_attribute_buffer(vertex_list, name), vertex_list.start + self.index * self._pool.vertex_count
+
+    @property
+    def position(self) -> Sequence:
+        """The position data of the slot, writable in place like a vertex list attribute.
+        """
+        return self._pool.get_region(self, 'position')
+
+    def delete(self):
+        self._pool.free(self)
+        self._pool = None
+
+
+class ArenaBlock:
+    """A vertex list with room for a fixed number of slots.
+    """
+    vertex_list: pyglet.graphics.vertexdomain.IndexedVertexList
+    slots: list[ArenaSlot | None]
+    free: list[int]  # indexes of the free slots; the lowest is reused first
+
+    def __init__(self, vertex_list: pyglet.graphics.vertexdomain.IndexedVertexList, size: int):
+        self.vertex_list = vertex_list
+        self.slots = [None] * size
+        self.free = list(range(size - 1, -1, -1))
+
+
+class ArenaPool:
+    """The slots of one size (e.g. 4-vertex quads) drawn with one group.
+    """
+    vertex_count: int
+    indices: tuple[int, ...]
+    block_size: int
+    compact_interval: int
+    _batch: pyglet.graphics.Batch
+    _group: pyglet.graphics.Group
+    blocks: list[ArenaBlock]
+    _frees: int = 0  # frees since the last compaction
+
+    def __init__(self, batch: pyglet.graphics.Batch, group: pyglet.graphics.Group, vertex_count: int,
+                 indices: tuple[int, ...], block_size: int, compact_interval: int):
+        self._batch = batch
+        self._group = group
+        self.vertex_count = vertex_count
+        self.indices = indices
+        self.block_size = block_size
+        self.compact_interval = compact_interval
+        self.blocks = []
+
+    def _create_block(self) -> ArenaBlock:
+        count = self.vertex_count * self.block_size
+        indices = [index + slot * self.vertex_count for slot in range(self.block_size) for index in self.indices]
+        # unused slots are degenerate: all their vertices are at the origin.
+        vertex_list = pyglet.sprite.get_default_shader().vertex_list_indexed(
+            count, gl.GL_TRIANGLES, indices, self._batch, self._group,
+            position=('f', (0.0, 0.0, 0.0) * count),
+            colors=('Bn', (0, 0, 0, 0) * count),
+            tex_coords=('f', (0.0, 0.0, 0.0) * count),
+            scale=('f', (1.0, 1.0) * count)
+        )
+        block = ArenaBlock(vertex_list, self.block_size)
+        self.blocks.append(block)
+        return block
+
+    def allocate(self) -> ArenaSlot:
+        # the first blocks are filled first, so the last ones empty out and can be released.
+        block = next((x for x in self.blocks if x.free), None) or self._create_block()
+        index = block.free.pop()
+        slot = block.slots[index] = ArenaSlot(self, block, index)
+        return slot
+
+    def write(self, slot: ArenaSlot, name: str, data: Sequence):
+        vertex_list = slot.block.vertex_list
+        get_attribute_buffer(vertex_list, name).set_region(vertex_list.start + slot.index * self.vertex_count,
+                                                           self.vertex_count, data)
+
+    def get_region(self, slot: ArenaSlot, name: str) -> Sequence:
+        vertex_list = slot.block.vertex_list
+        return map_buffer_region(get_attribute_buffer(vertex_list, name),
+                                 vertex_list.start + slot.index * self.vertex_count, self.vertex_count)
+
+    def free(self, slot: ArenaSlot):
+        block = slot.block
+        self.write(slot, 'position', (0.0, 0.0, 0.0) * self.vertex_count)
+        block.slots[slot.index] = None
+        block.free.append(slot.index)
+        block.free.sort(reverse=True)
+
+        self._frees += 1
+        if self._frees >= self.compact_interval:
+            self.compact()
+
+    def _move(self, slot: ArenaSlot, block: ArenaBlock, index: int):
+        """Copies the vertices of the slot to another place and points the slot there.
+        """
+        old_list, new_list = slot.block.vertex_list, block.vertex_list
+        old_start = old_list.start + slot.index * self.vertex_count
+        new_start = new_list.start + index * self.vertex_count
+        for name in old_list.domain.attribute_names:
+            buffer = get_attribute_buffer(old_list, name)
+            buffer.set_region(new_start, self.vertex_count, map_buffer_region(buffer, old_start, self.vertex_count)[:])
+
+        slot.block.slots[slot.index] = None
+        slot.block.free.append(slot.index)
+        block.slots[index] = slot
+        slot.block, slot.index = block, index
+
+    def compact(self):
+        """Moves the slots of the last blocks to the free slots of the first ones and
+        deletes the blocks that become empty.
+        """
+        self._frees = 0
+        while len(self.blocks) > 1:
+            last = self.blocks[-1]
+            live = [x for x in last.slots if x is not None]
+            holes = sum([len(x.free) for x in self.blocks[:-1]])
+            if len(live) > holes:
+                break
+            for slot in live:
+                block = next(x for x in self.blocks[:-1] if x.free)
+                self._move(slot, block, block.free.pop())
+            last.vertex_list.delete()
+            self.blocks.pop()
+        if len(self.blocks) == 1 and not any(self.blocks[0].slots):
+            self.blocks.pop().vertex_list.delete()
+
+    def delete(self):
+        for block in self.blocks:
+            block.vertex_list.delete()
+        self.blocks = []
+
+
+class VertexArena:
+    """Per-Manager allocator of the vertices of the theme's graphic elements.
+
+    Instead of a vertex list per element, 4-vertex quads and 16-vertex nine-slices are
+    sub-allocated from large shared vertex lists, one pool per group and size. Freed
+    slots are reused and the pools are compacted every 'compact_interval' frees, so
+    hover, state and popup changes do not fragment the vertex domains.
+    """
+    block_size: int
+    compact_interval: int
+    _batch: pyglet.graphics.Batch
+    _pools: dict[tuple[pyglet.graphics.Group, int], ArenaPool]
+
+    def __init__(self, batch: pyglet.graphics.Batch, block_size: int = 64, compact_interval: int = 64):
+        """Create a VertexArena.
+
+        :Parameters:
+            'batch' : '~pyglet.graphics.Batch'
+                the batch where the vertices are drawn
+            'block_size' : int
+                slots in each shared vertex list
+            'compact_interval' : int
+                frees of a pool between its compactions
+        """
+        self._batch = batch
+        self.block_size = block_size
+        self.compact_interval = compact_interval
+        self._pools = {}
+
+    def allocate(self, group: pyglet.graphics.Group, indices: tuple[int, ...], vertex_count: int,
+                 **data: Sequence) -> ArenaSlot:
+        """Allocates a slot of 'vertex_count' vertices drawn with the group and sets its
+        attribute data, e.g. position=(...), colors=(...).
+        """
+        pool = self._pools.get((group, vertex_count))
+        if pool is None:
+            pool = self._pools[(group, vertex_count)] = ArenaPool(self._batch, group, vertex_count, indices,
+                                                                  self.block_size, self.compact_interval)
+        assert pool.indices == tuple(indices)
+        slot = pool.allocate()
+        for name, values in data.items():
+            slot.set_attribute_data(name, values)
+        return slot
+
+    def compact(self):
+        for pool in self._pools.values():
+            pool.compact()
+
+    def get_stats(self) -> dict[str, int]:
+        blocks = [block for pool in self._pools.values() for block in pool.blocks]
+        return {'pools': len(self._pools),
+                'blocks': len(blocks),
+                'slots': sum([len(x.slots) for x in blocks]),
+                'free_slots': sum([len(x.free) for x in blocks])}
+
+    def delete(self):
+        for pool in self._pools.values():
+            pool.delete()
+        self._pools.clear()
@@ -2,6 +2,9 @@ from abc import abstractmethod
 import pyglet
 from pyglet import gl
 from ..core import Rectangle
+from ..gl_state import gl_state, TEXT_GROUP_MAX_ORDER
+from .arena import ArenaSlot, VertexArena
+from .frame_batch import FrameGeometryBatch
 
 
 class ThemeTextureGroup(pyglet.graphics.Group):
@@ -23,20 +26,22 @@ class ThemeTextureGroup(pyglet.graphics.Group):
             'parent' : '~pyglet.graphics.Group'
                 parent group of this group
         """
+        # the state cache relies on the text groups of the same parent being drawn first.
+        assert order > TEXT_GROUP_MAX_ORDER, "theme groups must be sorted after the text groups"
         super().__init__(order=order, parent=parent)
         self.texture = texture
         self.program = pyglet.sprite.get_default_shader()
+        gl_state.set_texture_filter(texture, gl.GL_NEAREST)
 
     def set_state(self):
-        gl.glActiveTexture(gl.GL_TEXTURE0)
-        gl.glBindTexture(self.texture.target, self.texture.id)
-        gl.glEnable(gl.GL_BLEND)
-        gl.glBlendFunc(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
-        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
-        self.program.use()
+        # the state is shared with the next theme groups; the manager group restores it.
+        gl_state.bind_texture(self.texture.target, self.texture.id)
+        gl_state.enable(gl.GL_BLEND)
+        gl_state.blend_func(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA)
+        gl_state.use_program(self.program)
 
     def unset_state(self):
-        gl.glDisable(gl.GL_BLEND)
+        pass
 
     def __hash__(self):
         return hash((self.texture.target, self.texture.id, self.order, self.parent, self.program))
@@ -50,11 +55,36 @@ class ThemeTextureGroup(pyglet.graphics.Group):
                 self.parent == other.parent)
 
 
+def _find_group_attribute(group: pyglet.graphics.Group | None, name: str):
+    while group is not None:
+        value = getattr(group, name, None)
+        if value is not None:
+            return value
+        group = group.parent
+    return None
+
+
+def find_vertex_arena(group: pyglet.graphics.Group | None) -> VertexArena | None:
+    """Returns the vertex arena of the manager the group belongs to, if it has one.
+    """
+    return _find_group_attribute(group, 'vertex_arena')
+
+
+def find_frame_geometry(group: pyglet.graphics.Group | None) -> FrameGeometryBatch | None:
+    """Returns the frame geometry batch of the manager the group belongs to, if it has one.
+    """
+    return _find_group_attribute(group, 'frame_geometry')
+
+
 class GraphicElement(Rectangle):
     _color: tuple[int, int, int, int]
     _batch: pyglet.graphics.Batch
     _group: pyglet.graphics.Group | None
-    _vertex_list: pyglet.graphics.vertexarray.VertexArray | pyglet.graphics.vertexdomain.IndexedVertexList | None = None
+    _vertex_list: pyglet.graphics.vertexarray.VertexArray | pyglet.graphics.vertexdomain.IndexedVertexList | \
+        ArenaSlot | None = None
+    _written_geometry: tuple[int, int, int, int] | None = None  # (x, y, width, height) of the vertices
+    writes_performed: int = 0  # vertex position writes of all the elements
+    writes_skipped: int = 0  # updates that did not change the geometry of their element
 
     def __init__(self, color: tuple[int, int, int, int], batch: pyglet.graphics.Batch, group: pyglet.graphics.Group,
                  width: int = 0, height: int = 0):
@@ -83,7 +113,7 @@ class GraphicElement(Rectangle):
         assert self._vertex_list is None
         self._vertex_list = pyglet.sprite.get_default_shader().vertex_list(
             12, gl.GL_LINES, self._batch, self._group,
-            position=('f', self._get_vertices()),
+            position=('f', self._get_vertices(True)),
             colors=('Bn', self._color * 12),
             scale=('f', (1.0, 1.0) * 12)
         )
@@ -104,8 +134,24 @@ class GraphicElement(Rectangle):
     def unload(self):
         self._vertex_list.delete()
         self._vertex_list = None
+        self._written_geometry = None
         self._group = None
 
+    @property
+    def vertex_list(self) -> pyglet.graphics.vertexdomain.IndexedVertexList | ArenaSlot | None:
+        return self._vertex_list
+
+    @staticmethod
+    def get_write_counts() -> tuple[int, int]:
+        """Returns the (performed, skipped) vertex position writes of all the elements.
+        """
+        return GraphicElement.writes_performed, GraphicElement.writes_skipped
+
+    @staticmethod
+    def reset_write_counts():
+        GraphicElement.writes_performed = 0
+        GraphicElement.writes_skipped = 0
+
     def get_content_region(self) -> tuple[int, int, int, int]:
         return self.x, self.y, self.width, self.height
 
@@ -120,7 +166,13 @@ class GraphicElement(Rectangle):
         self.width, self.height = width, height
 
         if self._vertex_list is not None:
-            self._vertex_list.position[:] = self._get_vertices(True)
+            geometry = (int(x), int(y), int(width), int(height))
+            if geometry == self._written_geometry:
+                GraphicElement.writes_skipped += 1
+                return
+            self._vertex_list.set_attribute_data('position', self._get_vertices(True))
+            self._written_geometry = geometry
+            GraphicElement.writes_performed += 1
 
 
 class TextureGraphicElement(GraphicElement):
@@ -153,9 +205,16 @@ class TextureGraphicElement(GraphicElement):
 
     def _load(self):
         assert self._vertex_list is None
+        arena = find_vertex_arena(self._group)
+        if arena is not None:
+            self._vertex_list = arena.allocate(self._group, (0, 1, 2, 0, 2, 3), 4,
+                                               position=self._get_vertices(True),
+                                               colors=self._color * 4,
+                                               tex_coords=self.texture.tex_coords)
+            return
         self._vertex_list = pyglet.sprite.get_default_shader().vertex_list_indexed(
             4, gl.GL_TRIANGLES, (0, 1, 2, 0, 2, 3), self._batch, self._group,
-            position=('f', self._get_vertices()),
+            position=('f', self._get_vertices(True)),
             colors=('Bn', self._color * 4),
             tex_coords=('f', self.texture.tex_coords),
             scale=('f', (1.0, 1.0) * 4)
@@ -179,6 +238,8 @@ class FrameTextureGraphicElement(GraphicElement):
     inner_texture: pyglet.image.TextureRegion
     margins: tuple[int, int, int, int]
     padding: list[int, int, int, int]
+    _frame_geometry: FrameGeometryBatch | None = None
+    _frame_geometry_row: int = 0
 
     def __init__(self, outer_texture: pyglet.image.Texture, inner_texture: pyglet.image.TextureRegion,
                  margins: list[int, int, int, int], padding: list[int, int, int, int],
@@ -218,14 +279,46 @@ class FrameTextureGraphicElement(GraphicElement):
 
     def _load(self):
         assert self._vertex_list is None
+        self._frame_geometry = find_frame_geometry(self._group)
+        if self._frame_geometry is not None:
+            self._frame_geometry_row = self._frame_geometry.add(self)
+        arena = find_vertex_arena(self._group)
+        if arena is not None:
+            self._vertex_list = arena.allocate(self._group, self._get_vertice_indexes(), 16,
+                                               position=self._get_vertices(True),
+                                               colors=self._color * 16,
+                                               tex_coords=self._get_tex_coords())
+            return
         self._vertex_list = pyglet.sprite.get_default_shader().vertex_list_indexed(
             16, gl.GL_TRIANGLES, self._get_vertice_indexes(), self._batch, self._group,
-            position=('f', self._get_vertices()),
+            position=('f', self._get_vertices(True)),
             colors=('Bn', self._color * 16),
             tex_coords=('f', self._get_tex_coords()),
             scale=('f', (1.0, 1.0) * 16)
         )
 
+    def unload(self):
+        if self._frame_geometry is not None:
+            self._frame_geometry.remove(self._frame_geometry_row)
+            self._frame_geometry = None
+        super().unload()
+
+    def update(self, x, y, width, height):
+        if self._frame_geometry is None:
+            return super().update(x, y, width, height)
+
+        # the vertices are computed together with the other frames of the manager.
+        self.set_position(x, y)
+        self.width, self.height = width, height
+        if self._vertex_list is not None:
+            geometry = (int(x), int(y), int(width), int(height))
+            if geometry == self._written_geometry:
+                GraphicElement.writes_skipped += 1
+                return
+            self._frame_geometry.set_rect(self._frame_geometry_row, *geometry)
+            self._written_geometry = geometry
+            GraphicElement.writes_performed += 1
+
     @staticmethod
     def _get_vertice_indexes() -> tuple:
         return (0, 1, 2, 2, 1, 3,  # bottom right
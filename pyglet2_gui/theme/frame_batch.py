@@ -0,0 +1,125 @@
+from __future__ import annotations
+from typing import Any
+import pyglet
+from .arena import get_vertex_location, map_buffer_region
+
+try:
+    import numpy
+except ImportError:  # numpy is optional; only the batched frame geometry needs it.
+    numpy = None
+
+# which of the 4 x edges and 4 y edges of a nine-slice each of its 16 vertices uses,
+# in the order of FrameTextureGraphicElement._get_vertices.
+_X_EDGES = (0, 1, 0, 1, 2, 3, 2, 3, 0, 1, 0, 1, 2, 3, 2, 3)
+_Y_EDGES = (0, 0, 1, 1, 0, 0, 1, 1, 2, 2, 3, 3, 2, 2, 3, 3)
+_VERTEX_COUNT = len(_X_EDGES)
+
+
+class FrameGeometryBatch:
+    """Per-Manager NumPy structure with the (x, y, width, height) and margins of every
+    nine-slice frame element of the manager.
+
+    Elements only record their rectangle when they move or resize. On flush, which the
+    manager does at the end of its layout pass (and at the latest before the next
+    frame), the vertices of all the changed frames are computed in one vectorized
+    operation into a shared array. The frames whose vertices follow each other in a
+    vertex buffer (e.g. the slots of a vertex arena) are copied as one slab.
+    """
+    _elements: list[Any]  # FrameTextureGraphicElement or None for free rows
+    _rects: Any  # numpy array (capacity, 4): x, y, width, height
+    _margins: Any  # numpy array (capacity, 4): top, right, bottom, left
+    _dirty: Any  # numpy bool array (capacity,)
+    _free: list[int]
+    _scheduled: bool = False
+
+    def __init__(self, capacity: int = 64):
+        if numpy is None:
+            raise ImportError("FrameGeometryBatch requires numpy")
+        self._elements = [None] * capacity
+        self._rects = numpy.zeros((capacity, 4), dtype=numpy.float32)
+        self._margins = numpy.zeros((capacity, 4), dtype=numpy.float32)
+        self._dirty = numpy.zeros(capacity, dtype=bool)
+        self._free = list(range(capacity - 1, -1, -1))
+
+    def _grow(self):
+        capacity = len(self._elements)
+        self._elements.extend([None] * capacity)
+        self._rects = numpy.concatenate((self._rects, numpy.zeros_like(self._rects)))
+        self._margins = numpy.concatenate((self._margins, numpy.zeros_like(self._margins)))
+        self._dirty = numpy.concatenate((self._dirty, numpy.zeros_like(self._dirty)))
+        self._free = list(range(2 * capacity - 1, capacity - 1, -1))
+
+    def add(self, element: Any) -> int:
+        """Adds a frame element and returns its row.
+        """
+        if not self._free:
+            self._grow()
+        row = self._free.pop()
+        self._elements[row] = element
+        self._margins[row] = element.margins
+        self._dirty[row] = False
+        return row
+
+    def remove(self, row: int):
+        self._elements[row] = None
+        self._dirty[row] = False
+        self._free.append(row)
+
+    def set_rect(self, row: int, x: int, y: int, width: int, height: int):
+        self._rects[row] = (x, y, width, height)
+        self._dirty[row] = True
+        if not self._scheduled:
+            self._scheduled = True
+            pyglet.clock.schedule_once(self._on_flush, 0)
+
+    def _on_flush(self, dt: float):
+        self.flush()
+
+    def compute(self, rows: Any) -> Any:
+        """Returns the vertices of the frames of the rows, as an array (rows, 48).
+        """
+        x, y, width, height = numpy.trunc(self._rects[rows]).T
+        top, right, bottom, left = self._margins[rows].T
+        xs = numpy.stack((x, x + left, x + width - right, x + width), axis=1)
+        ys = numpy.stack((y, y + bottom, y + height - top, y + height), axis=1)
+        vertices = numpy.zeros((len(rows), 16, 3), dtype=numpy.float32)
+        vertices[:, :, 0] = xs[:, _X_EDGES]
+        vertices[:, :, 1] = ys[:, _Y_EDGES]
+        return vertices.reshape(len(rows), 48)
+
+    def flush(self):
+        """Writes the vertices of the frames whose rectangle changed.
+        """
+        if self._scheduled:
+            pyglet.clock.unschedule(self._on_flush)
+            self._scheduled = False
+        rows = numpy.flatnonzero(self._dirty)
+        if not len(rows):
+            return
+        self._dirty[rows] = False
+        vertices = self.compute(rows)
+        locations = [get_vertex_location(self._elements[row].vertex_list, 'position') for row in rows]
+        # sorted by place in the buffers, runs of adjacent frames are written with one copy.
+        order = sorted(range(len(rows)), key=lambda i: (id(locations[i][0]), locations[i][1]))
+        run = [order[0]]
+        for index in order[1:]:
+            (buffer, start), (last_buffer, last_start) = locations[index], locations[run[-1]]
+            if buffer is last_buffer and start == last_start + _VERTEX_COUNT:
+                run.append(index)
+            else:
+                self._write(run, locations, vertices)
+                run = [index]
+        self._write(run, locations, vertices)
+
+    @staticmethod
+    def _write(run: list[int], locations: list[tuple[Any, int]], vertices: Any):
+        buffer, start = locations[run[0]]
+        region = map_buffer_region(buffer, start, _VERTEX_COUNT * len(run))
+        numpy.ctypeslib.as_array(region)[:] = vertices[run].ravel()
+
+    def delete(self):
+        if self._scheduled:
+            pyglet.clock.unschedule(self._on_flush)
+            self._scheduled = False
+        self._elements = []
+        self._free = []
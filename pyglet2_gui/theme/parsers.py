@@ -1,6 +1,20 @@
 from abc import abstractmethod
 import pyglet.resource
 from .templates import TextureTemplate, FrameTextureTemplate
+from .resources import registry
+
+
+def collect_image_sources(dictionary: dict) -> list[str]:
+    """Returns the filenames of every image referenced in the (unparsed) theme dictionary.
+    Does not use GL, so it can run outside the main thread.
+    """
+    sources = []
+    for key, value in dictionary.items():
+        if key.startswith('image'):
+            sources.append(value.get('source') if isinstance(value, dict) else value)
+        elif isinstance(value, dict):
+            sources.extend(collect_image_sources(value))
+    return sources
 
 
 class Parser:
@@ -19,7 +33,9 @@ class TextureParser(Parser):
     Parses texture and returns a 'TextureTemplate' or 'FrameTextureTemplate'
     """
     _textures: dict
-    _loader: pyglet.resource.Loader
+    _regions: dict[tuple, pyglet.image.TextureRegion]  # (source, region, frame) -> region of the source
+    _resources_path: str
+    _preloaded: list  # registry keys of the images decoded by preload
 
     def __init__(self, resources_path: str):
         """Creates a TextureParser
@@ -28,46 +44,105 @@ class TextureParser(Parser):
             'resources_path' : str
                 the directory path to the resource of the textures
         """
-        pyglet.resource.path.append(resources_path)
         self._textures = {}
-        self._loader = pyglet.resource.Loader(resources_path)
+        self._regions = {}
+        self._resources_path = resources_path
+        self._preloaded = []
 
     def condition_fulfilled(self, key: str) -> bool:
         return key.startswith('image')
 
-    def _get_texture(self, filename: str) -> pyglet.image.Texture:
-        """Returns the texture associated with the filename. Loads it from
-        resources if it hasn't done before.
+    def get_texture(self, filename: str) -> pyglet.image.Texture:
+        """Returns the texture associated with the filename. Acquires it from
+        the resource registry if it hasn't done before.
         """
         if filename not in self._textures:
-            texture = self._loader.texture(filename)
-            self._textures[filename] = texture
+            self._textures[filename] = registry.acquire_texture(self._resources_path, filename)
         return self._textures[filename]
 
+    def collect_sources(self, dictionary: dict) -> list[str]:
+        """Returns the filenames of every image referenced in the (unparsed) theme dictionary.
+        """
+        return collect_image_sources(dictionary)
+
+    def preload(self, dictionary: dict, max_workers: int = 0):
+        """Decodes the images of the theme dictionary before it is parsed, in 'max_workers'
+        processes if it is not 0.
+        """
+        self._preloaded.extend(registry.preload(self._resources_path, self.collect_sources(dictionary), max_workers))
+
+    def discard_preloaded(self):
+        """Frees the preloaded images that were not acquired, once the theme is built.
+        """
+        registry.discard_decoded(self._preloaded)
+        self._preloaded = []
+
+    def release(self):
+        """Releases the textures acquired from the resource registry.
+        """
+        self.discard_preloaded()
+        for texture in self._textures.values():
+            registry.release_texture(texture)
+        self._textures.clear()
+        self._regions.clear()
+
+    def invalidate(self, filenames: list[str]):
+        """Releases the textures of the files, e.g. because they were edited, so they are
+        acquired again the next time an element uses them.
+        """
+        for filename in filenames:
+            texture = self._textures.pop(filename, None)
+            if texture is not None:
+                registry.release_texture(texture)
+        self._regions = {k: v for k, v in self._regions.items() if k[0] not in filenames}
+
     def _get_texture_region(self, filename: str, x: int, y: int, width: int, height: int) -> pyglet.image.TextureRegion:
-        """Same as _get_texture, but limits the texture for a region
-        x, y, width, height.
+        """Same as get_texture, but limits the texture for a region
+        x, y, width, height. The region is a view into the source texture.
+        """
+        key = (filename, (x, y, width, height), None)
+        if key not in self._regions:
+            self._regions[key] = self.get_texture(filename).get_region(x, y, width, height)
+        return self._regions[key]
+
+    def _get_inner_region(self, filename: str, region: tuple | None, texture: pyglet.image.Texture,
+                          frame: list[int, int, int, int]) -> pyglet.image.TextureRegion:
+        """Returns the region inside the frame (top, right, bottom, left) of the texture,
+        shared by every template with the same source, region and frame.
+        """
+        key = (filename, region, tuple(frame))
+        if key not in self._regions:
+            self._regions[key] = FrameTextureTemplate.get_inner_region(texture, frame)
+        return self._regions[key]
+
+    def get_texture_memory(self) -> dict[int, int]:
+        """Returns the bytes of every GL texture the parsed templates use, by texture id.
+        Regions share the memory of their source texture.
         """
-        texture = self._get_texture(filename)
-        retval = texture.get_region(x, y, width, height).get_texture()
-        return retval
+        memory = {}
+        for texture in self._textures.values():
+            owner = getattr(texture, 'owner', None) or texture
+            memory[owner.id] = owner.width * owner.height * 4  # RGBA
+        return memory
 
     def parse_element(self, element: dict | str) -> TextureTemplate | FrameTextureTemplate:
         if isinstance(element, dict):
             # if it has a region, we create a texture from that region.
             # else, we use a full texture.
-            texture = self._get_texture_region(element.get('source'), *element.get('region')) if 'region' in element \
-                else self._get_texture(element.get('source'))
+            region = tuple(element.get('region')) if 'region' in element else None
+            texture = self._get_texture_region(element.get('source'), *region) if region is not None \
+                else self.get_texture(element.get('source'))
 
             # if it has frame, it is a FrameTexture
             # else, it is a simple texture.
             return FrameTextureTemplate(
                 texture,
                 element.get('frame'),
-                element.get('padding', [0, 0, 0, 0])  # if padding, else 0.
+                element.get('padding', [0, 0, 0, 0]),  # if padding, else 0.
+                inner_texture=self._get_inner_region(element.get('source'), region, texture, element.get('frame'))
             ) if 'frame' in element else TextureTemplate(texture)
 
         # if it is of the form {'image': 'test.png'}
         else:
-            texture = self._get_texture(element)
+            texture = self.get_texture(element)
             return TextureTemplate(texture)
@@ -0,0 +1,168 @@
+from __future__ import annotations
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import pyglet
+
+
+def decode_image(path: str, data: bytes) -> tuple[int, int, bytes]:
+    """Decodes the image file contents to (width, height, RGBA bytes). Does not use GL,
+    so it can run outside the main thread, or in another process.
+    """
+    image = pyglet.image.load(path, file=io.BytesIO(data)).get_image_data()
+    return image.width, image.height, image.get_data('RGBA', image.width * 4)
+
+
+class TextureEntry:
+    texture: pyglet.image.Texture
+    references: int = 0
+
+    def __init__(self, texture: pyglet.image.Texture):
+        self.texture = texture
+
+
+class ResourceRegistry:
+    """Process-wide cache of the textures of the themes, keyed by the absolute path and
+    the hash of their file. Themes loaded from the same directory, or a theme loaded
+    again, share the decoded textures. Textures are reference counted: when no theme
+    acquires a texture anymore it is dropped from the registry, and pyglet frees it
+    once it is not used.
+
+    The hash of a file is only computed again when its modification time or size
+    changed. The registry can be used from several threads: preload can run in a
+    background thread, while acquire_texture and release_texture need the GL context.
+    The files are read from the directory given to each call; pyglet's global resource
+    path is left alone.
+    """
+    _entries: dict[tuple[str, str], TextureEntry]
+    _keys: dict[int, tuple[str, str]]  # id(texture) -> its key in _entries
+    _decoded: dict[tuple[str, str], tuple[int, int, bytes]]  # preloaded images waiting to be uploaded
+    _digests: dict[str, tuple[int, int, str]]  # path -> (mtime_ns, size, hash) of the file
+    _lock: threading.Lock
+
+    def __init__(self):
+        self._entries = {}
+        self._keys = {}
+        self._decoded = {}
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def read_file(directory: str, filename: str) -> tuple[str, bytes, str]:
+        """Returns the absolute path, the contents and the hash of the file.
+        """
+        path = os.path.abspath(os.path.join(directory, filename))
+        with open(path, 'rb') as file:
+            data = file.read()
+        return path, data, hashlib.sha1(data).hexdigest()
+
+    def get_key(self, directory: str, filename: str) -> tuple[tuple[str, str], bytes | None]:
+        """Returns the key (absolute path, hash) of the file. The file is only read and
+        hashed if it changed since its last hash, in which case its contents are returned too.
+        """
+        path = os.path.abspath(os.path.join(directory, filename))
+        stat = os.stat(path)
+        with self._lock:
+            cached = self._digests.get(path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            return (path, cached[2]), None
+        path, data, digest = self.read_file(directory, filename)
+        with self._lock:
+            self._digests[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return (path, digest), data
+
+    def _read_new(self, directory: str, filename: str) -> tuple[tuple[str, str], bytes | None]:
+        """Returns the key and the contents of the file, or None if it is loaded or decoded already.
+        """
+        key, data = self.get_key(directory, filename)
+        with self._lock:
+            if key in self._entries or key in self._decoded:
+                return key, None
+        if data is None:
+            _, data, _ = self.read_file(directory, filename)
+        return key, data
+
+    def preload(self, directory: str, filenames: list[str], max_workers: int = 0) -> list[tuple[str, str]]:
+        """Reads and decodes the files that are not loaded yet, so that acquire_texture
+        only has to upload them. Can be called from any thread. Returns the keys of the
+        images decoded, to be passed to discard_decoded once the textures that are needed
+        were acquired.
+
+        pyglet's own PNG decoder is pure Python and holds the GIL, so the images are
+        decoded in parallel by processes, which return the raw RGBA bytes.
+
+        :Parameters:
+            'directory' : str
+                the directory of the files
+            'filenames' : list[str]
+                the files to decode
+            'max_workers' : int
+                processes decoding the files. Defaults to 0: decoded in the calling thread
+        """
+        files = [self._read_new(directory, x) for x in sorted(set(filenames))]
+        files = [(key, data) for key, data in files if data is not None]
+        if not files:
+            return []
+        paths, contents = [key[0] for key, _ in files], [data for _, data in files]
+        if max_workers and len(files) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                images = list(executor.map(decode_image, paths, contents))
+        else:
+            images = list(map(decode_image, paths, contents))
+        keys = []
+        with self._lock:
+            for (key, _), decoded in zip(files, images):
+                if key not in self._decoded:
+                    self._decoded[key] = decoded
+                    keys.append(key)
+        return keys
+
+    def discard_decoded(self, keys: list[tuple[str, str]]):
+        """Frees the preloaded images that were not acquired, e.g. because the load failed
+        or was cancelled, or because no element uses them.
+        """
+        with self._lock:
+            for key in keys:
+                self._decoded.pop(key, None)
+
+    def acquire_texture(self, directory: str, filename: str) -> pyglet.image.Texture:
+        """Returns the texture of the file, loading it if no theme uses it yet.
+        Every call must be matched by a call to release_texture.
+        """
+        key, data = self.get_key(directory, filename)
+        with self._lock:
+            entry = self._entries.get(key)
+            decoded = self._decoded.pop(key, None) if entry is None else None
+        if entry is None:
+            if decoded is None:
+                if data is None:
+                    _, data, _ = self.read_file(directory, filename)
+                decoded = decode_image(key[0], data)
+            width, height, pixels = decoded
+            texture = pyglet.image.ImageData(width, height, 'RGBA', pixels, width * 4).get_texture()
+            with self._lock:
+                entry = self._entries[key] = TextureEntry(texture)
+                self._keys[id(texture)] = key
+        with self._lock:
+            entry.references += 1
+        return entry.texture
+
+    def release_texture(self, texture: pyglet.image.Texture):
+        with self._lock:
+            key = self._keys[id(texture)]
+            entry = self._entries[key]
+            entry.references -= 1
+            if entry.references == 0:
+                del self._entries[key]
+                del self._keys[id(texture)]
+
+    def get_stats(self) -> dict[str, int]:
+        with self._lock:
+            return {'textures': len(self._entries),
+                    'references': sum([x.references for x in self._entries.values()]),
+                    'decoded': len(self._decoded)}
+
+
+registry = ResourceRegistry()
@@ -44,14 +44,22 @@ class FrameTextureTemplate(TextureTemplate):
     _inner_texture = pyglet.image.TextureRegion
 
     def __init__(self, texture: pyglet.image.Texture, frame: list[int, int, int, int], padding: list[int, int, int, int],
-                 width: int = None, height: int = None):
+                 width: int = None, height: int = None, inner_texture: pyglet.image.TextureRegion = None):
         super().__init__(texture, width=width, height=height)
         self._margins = frame  # top, right, bottom, left
-        region_frame = (self._margins[3], self._margins[2],  # x, y
-                        texture.width - self._margins[3] - self._margins[1],
-                        texture.height - self._margins[2] - self._margins[0])  # width, height
         self._padding = padding
-        self._inner_texture = texture.get_region(*region_frame).get_texture()
+        self._inner_texture = inner_texture or self.get_inner_region(texture, frame)
+
+    @staticmethod
+    def get_inner_region(texture: pyglet.image.Texture, frame: list[int, int, int, int]) \
+            -> pyglet.image.TextureRegion:
+        """Returns the region of the texture inside the frame (top, right, bottom, left), as a
+        view into the texture: only its texture coordinates are used.
+        """
+        region_frame = (frame[3], frame[2],  # x, y
+                        texture.width - frame[3] - frame[1],
+                        texture.height - frame[2] - frame[0])  # width, height
+        return texture.get_region(*region_frame)
 
     def generate(self, color: tuple[int, int, int, int], batch: pyglet.graphics.Batch, group: pyglet.graphics.Group) \
             -> FrameTextureGraphicElement:
@@ -1,8 +1,20 @@
 from __future__ import annotations
 import json
+import string
+import threading
+import time
+import weakref
+from collections.abc import Callable, Iterator
 from typing import Any
 import pyglet
 from .parsers import TextureParser
+from .templates import Template
+from ..text_metrics import FontKey, text_metrics
+
+PREWARM_CHARACTERS = string.ascii_letters + string.digits + string.punctuation + ' '
+
+# keys whose change can change the size of a widget, and thus requires a relayout.
+METRIC_KEYS = frozenset(('font_name', 'font_size', 'bold', 'italic', 'padding', 'offset'))
 
 
 class ScopedDict(dict):
@@ -90,9 +102,13 @@ class Theme(ScopedDict):
     It maps resources in the dictionary to resources in the path,
     initializing the correct template accordingly.
     """
+    resources_path: str
     _parsers: list
+    _prewarmed_fonts: list  # keeps the prewarmed fonts alive, so their glyphs stay in the atlas
+    _signatures: dict[tuple[str, ...], dict[str, tuple]] | None = None
 
-    def __init__(self, dictionary: dict, resources_path: str):
+    def __init__(self, dictionary: dict, resources_path: str, decode_workers: int = 0,
+                 parser: TextureParser | None = None):
         """Create a Theme.
 
         :Parameters:
@@ -100,14 +116,108 @@ class Theme(ScopedDict):
                 the dict object of the theme, e.g. {'font_name': 'Arial', 'font_size': 14}
             'resources_path' : str
                 directory path where the resources are found
+            'decode_workers' : int
+                processes decoding the images of the theme. Defaults to 0: decoded in the loading thread
+            'parser' : TextureParser
+                a parser of resources_path whose textures were already loaded, e.g. by load_async
         """
         super().__init__(dictionary, None)
-        self._parsers = [TextureParser(resources_path)]
-        self.build(self, dictionary)
+        self.resources_path = resources_path
+        self._parsers = [parser or TextureParser(resources_path)]
+        self._prewarmed_fonts = []
+        # first decode every image, then upload them and build the templates.
+        if parser is None:
+            for texture_parser in self._parsers:
+                texture_parser.preload(dictionary, decode_workers)
+        try:
+            self.build(self, dictionary)
+        finally:
+            for texture_parser in self._parsers:
+                texture_parser.discard_preloaded()
+        # the shared textures are released when the theme is garbage collected, unless released before.
+        for texture_parser in self._parsers:
+            weakref.finalize(self, texture_parser.release)
+
+    def release(self):
+        """Releases the shared textures of the theme. The theme must not be used afterwards.
+        """
+        for parser in self._parsers:
+            parser.release()
 
     def update(self, e: Any = None, **f: Any):
         super().update(e, **f)
         self.build(self, e)
+        self._signatures = None
+
+    def patch(self, dictionary: dict, sources: list[str] = ()):
+        """Builds the theme again from the dictionary, e.g. after its files were edited, and
+        replaces in place only the values that changed. The scopes stay the same objects.
+
+        :Parameters:
+            'dictionary' : dict
+                the new dict object of the theme
+            'sources' : list[str]
+                image files whose contents changed, so their textures are acquired again
+        """
+        for parser in self._parsers:
+            parser.invalidate(sources)
+        scope = ScopedDict()
+        self.build(scope, dictionary)
+        self._patch_scope(self, scope)
+        self._signatures = None
+
+    def _patch_scope(self, target: ScopedDict, source: ScopedDict):
+        for key in [x for x in dict.keys(target) if x not in source]:
+            dict.__delitem__(target, key)
+        for key, value in dict.items(source):
+            current = dict.get(target, key)
+            if isinstance(value, ScopedDict) and isinstance(current, ScopedDict):
+                self._patch_scope(current, value)
+            elif isinstance(value, ScopedDict):
+                value.parent = target
+                dict.__setitem__(target, key, value)
+            elif key not in target or isinstance(current, ScopedDict) or \
+                    self.get_value_signature(key, current) != self.get_value_signature(key, value):
+                dict.__setitem__(target, key, value)
+
+    @staticmethod
+    def get_value_signature(key: str, value: Any) -> tuple[Any, Any]:
+        """Returns the (metric, look) signature of a value of the theme. Two values with the
+        same metric part draw elements of the same size; with the same look part, the same
+        colors and textures.
+        """
+        if isinstance(value, Template):
+            texture = value.texture
+            return ((type(value).__name__, value.width, value.height,
+                     tuple(getattr(value, '_margins', ())), tuple(getattr(value, '_padding', ()))),
+                    (texture.id, tuple(texture.tex_coords)))
+        if isinstance(value, list):
+            value = tuple(value)
+        if key in METRIC_KEYS:
+            return value, None
+        return None, value
+
+    def get_signatures(self) -> dict[tuple[str, ...], dict[str, tuple]]:
+        """Returns, for every scope path of the theme, the signatures of the values visible
+        from that scope, including the inherited ones. Computed once per theme.
+        """
+        if self._signatures is None:
+            signatures = {}
+            scopes = [((), self, {})]
+            while scopes:
+                path, scope, inherited = scopes.pop()
+                resolved = dict(inherited)
+                children = []
+                for key, value in dict.items(scope):
+                    if isinstance(value, ScopedDict):
+                        resolved.pop(key, None)
+                        children.append((path + (key,), value))
+                    else:
+                        resolved[key] = self.get_value_signature(key, value)
+                signatures[path] = resolved
+                scopes.extend([(x, y, resolved) for x, y in children])
+            self._signatures = signatures
+        return self._signatures
 
     def build_element(self, key: str, value: Any, target: ScopedDict):
         if isinstance(value, list):
@@ -136,6 +246,123 @@ class Theme(ScopedDict):
         for key, value in input_dict.items():
             self.build_element(key, value, target)
 
+    def get_texture_memory(self) -> int:
+        """Returns the bytes of texture memory used by the textures of the theme.
+        """
+        memory = {}
+        for parser in self._parsers:
+            memory.update(parser.get_texture_memory())
+        return sum(memory.values())
+
+    def collect_fonts(self) -> set[FontKey]:
+        """Returns every (font_name, font_size, bold, italic) the theme resolves to,
+        in any of its scopes, e.g. a font_size only overridden in ['button', 'down'].
+        """
+        fonts = set()
+        scopes = [self]
+        while scopes:
+            scope = scopes.pop()
+            fonts.add((scope.get('font_name'), scope.get('font_size'),
+                       bool(scope.get('bold', False)), bool(scope.get('italic', False))))
+            scopes.extend([x for x in scope.values() if isinstance(x, ScopedDict)])
+        return fonts
+
+    def prewarm_fonts(self, characters: str = PREWARM_CHARACTERS,
+                      time_budget: float | None = None,
+                      on_done: Callable[[], Any] | None = None):
+        """Rasterizes the characters of every font of the theme into the glyph atlas, so
+        they are not rasterized while a widget appears for the first time.
+
+        :Parameters:
+            'characters' : str
+                the characters that are rasterized
+            'time_budget' : float
+                if given, the work is spread over several frames with pyglet.clock, using at
+                most about this many seconds per frame. Otherwise, everything is done now
+            'on_done' : Callable
+                called when every font was prewarmed
+        """
+        work = self._prewarm_work(characters)
+        if time_budget is None:
+            for _ in work:
+                pass
+            if on_done is not None:
+                on_done()
+            return
+
+        def step(dt: float):
+            deadline = time.perf_counter() + time_budget
+            for _ in work:
+                if time.perf_counter() >= deadline:
+                    pyglet.clock.schedule_once(step, 0)
+                    return
+            if on_done is not None:
+                on_done()
+
+        pyglet.clock.schedule_once(step, 0)
+
+    def _prewarm_work(self, characters: str, chunk_size: int = 16) -> Iterator[None]:
+        for key in self.collect_fonts():
+            font_name, font_size, bold, italic = key
+            font = pyglet.font.load(font_name, font_size, bold=bold, italic=italic)
+            self._prewarmed_fonts.append(font)
+            text_metrics.get_metrics(key)
+            for index in range(0, len(characters), chunk_size):
+                font.get_glyphs(characters[index:index + chunk_size])
+                yield
+
+
+class ThemeDiff:
+    """The scopes of a theme whose values differ in another theme, and whether the
+    difference only changes the look (colors, textures of the same size) or also the
+    metrics (fonts, paddings, sizes and margins of the images) of the widgets.
+    """
+    UNCHANGED: int = 0
+    SWAP: int = 1
+    RELAYOUT: int = 2
+    changes: dict[tuple[str, ...], int]  # scope path -> SWAP or RELAYOUT
+
+    def __init__(self, old_signatures: dict[tuple[str, ...], dict[str, tuple]],
+                 new_signatures: dict[tuple[str, ...], dict[str, tuple]]):
+        """Create a ThemeDiff from the Theme.get_signatures() of the two themes, or of the
+        same theme before and after it was patched.
+        """
+        self.changes = {}
+        for path in old_signatures.keys() | new_signatures.keys():
+            old_values, new_values = old_signatures.get(path), new_signatures.get(path)
+            if old_values is None or new_values is None:
+                self.changes[path] = self.RELAYOUT
+                continue
+            change = self.UNCHANGED
+            for key in old_values.keys() | new_values.keys():
+                old_value, new_value = old_values.get(key, (None, None)), new_values.get(key, (None, None))
+                if old_value == new_value:
+                    continue
+                if old_value[0] != new_value[0]:
+                    change = self.RELAYOUT
+                    break
+                change = self.SWAP
+            if change != self.UNCHANGED:
+                self.changes[path] = change
+
+    @classmethod
+    def from_themes(cls, old_theme: Theme, new_theme: Theme) -> ThemeDiff:
+        return cls(old_theme.get_signatures(), new_theme.get_signatures())
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    def get_change(self, paths: list[tuple[str, ...]]) -> int:
+        """Returns the largest change of the scopes of the paths and their sub-scopes. The
+        root path () only covers the root scope itself, not the whole theme.
+        """
+        change = self.UNCHANGED
+        for path in paths:
+            for scope, scope_change in self.changes.items():
+                if scope[:len(path)] == path and (path or not scope):
+                    change = max(change, scope_change)
+        return change
+
 
 class ThemeFromPath(Theme):
     """A theme that is loaded from a json in a path.
@@ -143,7 +370,7 @@ class ThemeFromPath(Theme):
     inside the resources_path given.
     """
 
-    def __init__(self, resources_path: str, theme_name: str = "theme.json"):
+    def __init__(self, resources_path: str, theme_name: str = "theme.json", decode_workers: int = 0):
         """Create a Theme from path.
 
         :Parameters:
@@ -151,11 +378,165 @@ class ThemeFromPath(Theme):
                 directory path where the resources are found
             'theme_name' : str
                 the filename of the theme json
+            'decode_workers' : int
+                processes decoding the images of the theme. Defaults to 0: decoded in the loading thread
         """
         print(resources_path, theme_name)
+        super().__init__(self.read_dictionary(resources_path, theme_name), resources_path, decode_workers)
+
+    @staticmethod
+    def read_dictionary(resources_path: str, theme_name: str = "theme.json") -> dict:
         theme_file = pyglet.resource.Loader(resources_path).file(theme_name)
         try:
-            dictionary = json.loads(theme_file.read().decode("utf-8"))  # TODO CHANGE THIS
+            return json.loads(theme_file.read().decode("utf-8"))  # TODO CHANGE THIS
         finally:
             theme_file.close()
-        super().__init__(dictionary, resources_path)
+
+    @staticmethod
+    def load_async(resources_path: str, theme_name: str = "theme.json", time_budget: float = 0.004,
+                   decode_workers: int = 0) -> ThemeLoadHandle:
+        """Loads a theme without blocking the event loop. The json is parsed and the images
+        are decoded in a background thread; the textures are then uploaded a few per frame
+        through pyglet.clock. For example, a Manager created with a small fallback theme
+        switches over when the theme is ready with:
+
+            handle = ThemeFromPath.load_async("theme/default")
+            handle.add_done_callback(lambda x: manager.update_theme(x.result()))
+
+        :Parameters:
+            'resources_path' : str
+                directory path where the resources are found
+            'theme_name' : str
+                the filename of the theme json
+            'time_budget' : float
+                seconds per frame spent uploading textures and building the theme
+            'decode_workers' : int
+                threads decoding the images of the theme
+        """
+        return ThemeLoadHandle(resources_path, theme_name, time_budget, decode_workers)
+
+
+class ThemeLoadHandle:
+    """Future-like handle of a theme loaded by ThemeFromPath.load_async. Its callbacks
+    are called from the pyglet event loop, in the main thread.
+    """
+    _resources_path: str
+    _theme_name: str
+    _time_budget: float
+    _decode_workers: int
+    _thread: threading.Thread | None
+    _dictionary: dict | None = None
+    _parser: TextureParser | None = None
+    _sources: list[str]  # images still to be uploaded
+    _source_count: int = 0
+    _theme: Theme | None = None
+    _exception: BaseException | None = None
+    _done: bool = False
+    _cancelled: bool = False
+    _lock: threading.Lock  # orders the end of the background thread with cancel
+    _callbacks: list[Callable[[ThemeLoadHandle], Any]]
+
+    def __init__(self, resources_path: str, theme_name: str, time_budget: float, decode_workers: int):
+        self._resources_path = resources_path
+        self._theme_name = theme_name
+        self._time_budget = time_budget
+        self._decode_workers = decode_workers
+        self._sources = []
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._decode, daemon=True)
+        self._thread.start()
+        pyglet.clock.schedule_once(self._step, 0)
+
+    def _decode(self):
+        """Parses the json and decodes the images. Runs in the background thread.
+        """
+        parser = TextureParser(self._resources_path)
+        try:
+            dictionary = ThemeFromPath.read_dictionary(self._resources_path, self._theme_name)
+            parser.preload(dictionary, self._decode_workers)
+        except Exception as e:
+            self._exception = e
+            return
+        with self._lock:
+            if not self._cancelled:
+                self._dictionary, self._parser = dictionary, parser
+                return
+        parser.release()  # cancelled while decoding: the decoded images are discarded.
+
+    def _step(self, dt: float):
+        if self._cancelled:
+            return
+        if self._thread is not None:
+            if self._thread.is_alive():
+                pyglet.clock.schedule_once(self._step, 0)
+                return
+            self._thread = None
+            if self._exception is not None:
+                self._finish()
+                return
+            self._sources = sorted(set(self._parser.collect_sources(self._dictionary)))
+            self._source_count = len(self._sources)
+
+        try:
+            deadline = time.perf_counter() + self._time_budget
+            while self._sources:
+                self._parser.get_texture(self._sources.pop())
+                if time.perf_counter() >= deadline:
+                    pyglet.clock.schedule_once(self._step, 0)
+                    return
+            self._theme = Theme(self._dictionary, self._resources_path, parser=self._parser)
+        except Exception as e:
+            self._exception = e
+            self._parser.release()
+        self._finish()
+
+    def _finish(self):
+        self._done = True
+        for callback in self._callbacks:
+            callback(self)
+        self._callbacks = []
+
+    @property
+    def progress(self) -> float:
+        """The fraction of the textures that were uploaded, from 0 to 1.
+        """
+        if self._done:
+            return 1.0
+        if self._thread is not None or not self._source_count:
+            return 0.0
+        return 1 - len(self._sources) / self._source_count
+
+    def done(self) -> bool:
+        return self._done
+
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def cancel(self) -> bool:
+        """Stops loading. The callbacks are not called.
+        """
+        if self._done:
+            return False
+        with self._lock:
+            self._cancelled = True
+        pyglet.clock.unschedule(self._step)
+        if self._parser is not None:
+            self._parser.release()
+        return True
+
+    def result(self) -> Theme:
+        assert self._done, "The theme is not loaded yet"
+        if self._exception is not None:
+            raise self._exception
+        return self._theme
+
+    def exception(self) -> BaseException | None:
+        assert self._done, "The theme is not loaded yet"
+        return self._exception
+
+    def add_done_callback(self, callback: Callable[[ThemeLoadHandle], Any]):
+        if self._done:
+            callback(self)
+        else:
+            self._callbacks.append(callback)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
+import weakref
+from typing import TYPE_CHECKING
+import pyglet
+from .parsers import collect_image_sources
+from .resources import registry
+from .theme import Theme, ThemeDiff
+
+if TYPE_CHECKING:
+    from ..manager import ViewerManager
+
+
+class ThemeWatcher:
+    """Reloads a theme while its files are edited, e.g. while designing a skin.
+
+    A background thread polls the files of the theme's directory every 'interval' seconds.
+    When the modification time of a file changes, its hash is compared; if the contents
+    changed, the theme json is parsed and the changed images are decoded in the thread.
+    The theme is then patched in place from the pyglet event loop and only the widgets of
+    the managers that load their graphics from the changed scopes are reloaded:
+
+        watcher = ThemeWatcher(theme, managers=[manager])
+        ...
+        watcher.stop()
+    """
+    theme: Theme
+    theme_name: str
+    interval: float
+    last_error: Exception | None = None  # the error of the last reload, e.g. an invalid json
+    _managers: weakref.WeakSet
+    _files: dict[str, tuple[int, int, str]]  # filename -> (mtime, size, hash)
+    _pending: tuple[dict, list[str], list] | None = None  # the dictionary, changed images and their preloads
+    _lock: threading.Lock
+    _stop: threading.Event
+    _thread: threading.Thread
+
+    def __init__(self, theme: Theme, managers: list[ViewerManager] | None = None,
+                 theme_name: str = "theme.json", interval: float = 0.5):
+        """Create a ThemeWatcher and start watching.
+
+        :Parameters:
+            'theme' : Theme
+                the theme, loaded from the directory of its resources_path
+            'managers' : list[ViewerManager]
+                the managers notified of the changes. More can be added with add_manager
+            'theme_name' : str
+                the filename of the theme json
+            'interval' : float
+                seconds between two polls of the directory
+        """
+        self.theme = theme
+        self.theme_name = theme_name
+        self.interval = interval
+        self._managers = weakref.WeakSet(managers or [])
+        self._files = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._scan()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        pyglet.clock.schedule_interval(self._apply, interval)
+
+    def add_manager(self, manager: ViewerManager):
+        self._managers.add(manager)
+
+    def remove_manager(self, manager: ViewerManager):
+        self._managers.discard(manager)
+
+    def _scan(self) -> list[str]:
+        """Returns the files whose contents changed since the last scan.
+        """
+        changed = []
+        directory = self.theme.resources_path
+        for root, _, filenames in os.walk(directory):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, directory).replace(os.sep, '/')
+                try:
+                    stat = os.stat(path)
+                    previous = self._files.get(name)
+                    if previous is not None and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+                        continue
+                    with open(path, 'rb') as file:
+                        digest = hashlib.sha1(file.read()).hexdigest()
+                except OSError:  # removed while scanning
+                    continue
+                self._files[name] = (stat.st_mtime_ns, stat.st_size, digest)
+                if previous is not None and previous[2] != digest:
+                    changed.append(name)
+        return changed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            changed = self._scan()
+            if changed:
+                self._load(changed)
+
+    def _load(self, changed: list[str]):
+        """Parses the json and decodes the changed images. Runs in the background thread.
+        """
+        try:
+            with open(os.path.join(self.theme.resources_path, self.theme_name), 'rb') as file:
+                dictionary = json.loads(file.read().decode("utf-8"))
+            sources = set(collect_image_sources(dictionary))
+            images = [x for x in changed if x in sources]
+            keys = registry.preload(self.theme.resources_path, images)
+        except Exception as e:  # e.g. the json is saved half-way; the next save retries.
+            self.last_error = e
+            return
+        with self._lock:
+            if self._pending is not None:
+                images = sorted(set(images) | set(self._pending[1]))
+                keys = self._pending[2] + keys
+            self._pending = (dictionary, images, keys)
+
+    def _apply(self, dt: float):
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        dictionary, images, keys = pending
+        old_signatures = self.theme.get_signatures()
+        try:
+            self.theme.patch(dictionary, images)
+        except Exception as e:
+            self.last_error = e
+            return
+        finally:
+            registry.discard_decoded(keys)  # the images the theme does not use anymore
+        self.last_error = None
+        diff = ThemeDiff(old_signatures, self.theme.get_signatures())
+        if not diff:
+            return
+        for manager in list(self._managers):
+            if manager.theme is self.theme:
+                manager.apply_theme_diff(diff)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        pyglet.clock.unschedule(self._apply)
+        if self._pending is not None:
+            registry.discard_decoded(self._pending[2])
+            self._pending = None
@@ -0,0 +1,19 @@
+import os
+import sys
+import pyglet
+
+# without a display (e.g. on a CI server without Xvfb), the GL tests use pyglet's EGL headless mode.
+if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+    pyglet.options['headless'] = True
+
+_window: pyglet.window.Window | None = None
+
+
+def get_window() -> pyglet.window.Window:
+    """Returns a hidden window, shared by the tests, whose context is current.
+    """
+    global _window
+    if _window is None:
+        _window = pyglet.window.Window(width=200, height=200, visible=False)
+    _window.switch_to()
+    return _window
@@ -0,0 +1,18 @@
+"""Runs the tests of pyglet2_gui, from the root of the repository:
+
+    python -m tests.runtests
+"""
+import os
+import sys
+import unittest
+
+
+def main() -> int:
+    tests_directory = os.path.dirname(os.path.abspath(__file__))
+    suite = unittest.defaultTestLoader.discover(tests_directory, top_level_dir=os.path.dirname(tests_directory))
+    result = unittest.TextTestRunner(verbosity=2).run(suite)
+    return 0 if result.wasSuccessful() else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+import unittest
+import pyglet
+from pyglet2_gui.theme.arena import VertexArena
+from tests import get_window
+
+QUAD = (0, 1, 2, 0, 2, 3)
+
+
+def get_quad(x: float) -> tuple[float, ...]:
+    return (x, 0.0, 0.0, x + 1, 0.0, 0.0, x + 1, 1.0, 0.0, x, 1.0, 0.0)
+
+
+class TestVertexArena(unittest.TestCase):
+    def setUp(self):
+        get_window()
+        self.batch = pyglet.graphics.Batch()
+        self.group = pyglet.graphics.Group()
+        self.arena = VertexArena(self.batch, block_size=4, compact_interval=1000)
+
+    def tearDown(self):
+        self.arena.delete()
+
+    def allocate(self, x: float):
+        return self.arena.allocate(self.group, QUAD, 4, position=get_quad(x))
+
+    def assert_position(self, slot, x: float):
+        self.assertEqual(tuple(slot.position), get_quad(x))
+
+    def test_slots_share_blocks(self):
+        slots = [self.allocate(x) for x in range(6)]
+        self.assertEqual(self.arena.get_stats(), {'pools': 1, 'blocks': 2, 'slots': 8, 'free_slots': 2})
+        for x, slot in enumerate(slots):
+            self.assert_position(slot, x)
+
+    def test_freed_slots_are_reused(self):
+        slots = [self.allocate(x) for x in range(4)]
+        slots[1].delete()
+        self.assert_position(slots[0], 0)
+        slot = self.allocate(10)
+        self.assertIs(slot.block, slots[0].block)
+        self.assertEqual(slot.index, 1)
+        self.assert_position(slot, 10)
+        self.assertEqual(self.arena.get_stats()['blocks'], 1)
+
+    def test_sizes_and_groups_have_their_own_pools(self):
+        self.allocate(0)
+        self.arena.allocate(self.group, QUAD * 2, 8, position=get_quad(0) * 2)
+        self.arena.allocate(pyglet.graphics.Group(order=1), QUAD, 4, position=get_quad(0))
+        self.assertEqual(self.arena.get_stats()['pools'], 3)
+
+    def test_compact_moves_the_last_slots(self):
+        slots = [self.allocate(x) for x in range(8)]
+        for slot in slots[:4:2] + slots[5:]:
+            slot.delete()
+        kept = {x: slots[x] for x in (1, 3, 4)}
+        self.arena.compact()
+        self.assertEqual(self.arena.get_stats(), {'pools': 1, 'blocks': 1, 'slots': 4, 'free_slots': 1})
+        for x, slot in kept.items():
+            self.assertIs(slot.block, kept[1].block)
+            self.assert_position(slot, x)
+
+    def test_compact_keeps_blocks_that_do_not_fit(self):
+        slots = [self.allocate(x) for x in range(8)]
+        slots[0].delete()
+        self.arena.compact()
+        self.assertEqual(self.arena.get_stats()['blocks'], 2)
+        for x, slot in enumerate(slots[1:], 1):
+            self.assert_position(slot, x)
+
+    def test_empty_pool_is_released(self):
+        for slot in [self.allocate(x) for x in range(5)]:
+            slot.delete()
+        self.arena.compact()
+        self.assertEqual(self.arena.get_stats(), {'pools': 1, 'blocks': 0, 'slots': 0, 'free_slots': 0})
+
+    def test_frees_compact_the_pool(self):
+        self.arena.delete()
+        arena = self.arena = VertexArena(self.batch, block_size=4, compact_interval=2)
+        slots = [self.allocate(x) for x in range(5)]
+        slots[0].delete()
+        self.assertEqual(arena.get_stats()['blocks'], 2)
+        slots[1].delete()  # the second free compacts: the last slot moves to the first block
+        self.assertEqual(arena.get_stats()['blocks'], 1)
+        self.assert_position(slots[4], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import pyglet
+from pyglet2_gui.coalescer import InputCoalescer
+
+
+class TestInputCoalescer(unittest.TestCase):
+    def setUp(self):
+        self.coalescer = InputCoalescer()
+        self.events = []
+
+    def tearDown(self):
+        self.coalescer.delete()
+
+    def on_motion(self, *event: int) -> bool:
+        self.events.append(('motion', *event))
+        return True
+
+    def on_drag(self, *event: int) -> bool:
+        self.events.append(('drag', *event))
+        return True
+
+    def test_events_are_merged(self):
+        self.coalescer.add(self.on_motion, 1, 1, 1, 1)
+        self.coalescer.add(self.on_motion, 3, 2, 2, 1)
+        self.coalescer.add(self.on_motion, 2, 5, -1, 3)
+        self.assertEqual(self.events, [])
+        self.assertTrue(self.coalescer.flush())
+        self.assertEqual(self.events, [('motion', 2, 5, 2, 5)])
+
+    def test_flush_without_event(self):
+        self.assertIsNone(self.coalescer.flush())
+        self.coalescer.add(self.on_motion, 1, 1, 1, 1)
+        self.coalescer.flush()
+        self.assertIsNone(self.coalescer.flush())
+        self.assertEqual(len(self.events), 1)
+
+    def test_different_events_keep_their_order(self):
+        self.coalescer.add(self.on_motion, 1, 1, 1, 1)
+        self.coalescer.add(self.on_drag, 2, 2, 1, 1, pyglet.window.mouse.LEFT, 0)
+        self.coalescer.add(self.on_drag, 3, 3, 1, 1, pyglet.window.mouse.LEFT, 0)
+        # other buttons or modifiers are not merged.
+        self.coalescer.add(self.on_drag, 4, 4, 1, 1, pyglet.window.mouse.LEFT, pyglet.window.key.MOD_SHIFT)
+        self.coalescer.flush()
+        self.assertEqual(self.events, [('motion', 1, 1, 1, 1),
+                                       ('drag', 3, 3, 2, 2, pyglet.window.mouse.LEFT, 0),
+                                       ('drag', 4, 4, 1, 1, pyglet.window.mouse.LEFT, pyglet.window.key.MOD_SHIFT)])
+
+    def test_clock_tick_dispatches(self):
+        self.coalescer.add(self.on_motion, 1, 1, 1, 1)
+        pyglet.clock.tick()
+        self.assertEqual(self.events, [('motion', 1, 1, 1, 1)])
+        pyglet.clock.tick()
+        self.assertEqual(len(self.events), 1)
+
+    def test_delete_drops_the_pending_event(self):
+        self.coalescer.add(self.on_motion, 1, 1, 1, 1)
+        self.coalescer.delete()
+        pyglet.clock.tick()
+        self.assertIsNone(self.coalescer.flush())
+        self.assertEqual(self.events, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import pyglet
+from pyglet2_gui.document import Document
+
+
+class FakeDialog:
+    """The part of a Manager used to style a document: its theme's font defaults.
+    """
+    def __init__(self, color: tuple[int, int, int, int], font_name: str = 'Arial', font_size: int = 12):
+        self.theme = dict(font_color=color, font_name=font_name, font_size=font_size)
+
+
+class TestDocumentStyle(unittest.TestCase):
+    def setUp(self):
+        self.document = pyglet.text.document.FormattedDocument('hello world')
+        self.viewer = Document(self.document, width=100, height=100)
+        self.styled = []
+        self.document.push_handlers(on_style_text=self._on_style_text)
+
+    def tearDown(self):
+        self.document.remove_handlers(on_style_text=self._on_style_text)
+
+    def _on_style_text(self, start: int, end: int, attributes: dict):
+        self.styled.append((start, end))
+
+    def get_colors(self) -> list:
+        return list(self.document.get_style_runs('color').ranges(0, len(self.document.text)))
+
+    def test_styles_the_whole_document(self):
+        self.viewer.do_set_document_style(FakeDialog((1, 1, 1, 255)))
+        self.assertEqual(self.get_colors(), [(0, 11, (1, 1, 1, 255))])
+
+    def test_styles_only_the_inserted_text(self):
+        dialog = FakeDialog((1, 1, 1, 255))
+        self.viewer.do_set_document_style(dialog)
+        self.document.insert_text(11, ' again')
+        self.styled.clear()
+        self.viewer.do_set_document_style(dialog)
+        self.assertTrue(self.styled)
+        self.assertTrue(all([start >= 11 and end <= 17 for start, end in self.styled]))
+
+    def test_unchanged_document_is_not_styled_again(self):
+        dialog = FakeDialog((1, 1, 1, 255))
+        self.viewer.do_set_document_style(dialog)
+        self.styled.clear()
+        self.viewer.do_set_document_style(dialog)
+        self.assertEqual(self.styled, [])
+
+    def test_theme_change_keeps_user_styles(self):
+        self.viewer.do_set_document_style(FakeDialog((1, 1, 1, 255)))
+        # the user sets the value of the old default: it is still the user's.
+        self.document.set_style(0, 5, {'color': (1, 1, 1, 255)})
+        self.viewer.do_set_document_style(FakeDialog((2, 2, 2, 255)))
+        self.assertEqual(self.get_colors(), [(0, 5, (1, 1, 1, 255)), (5, 11, (2, 2, 2, 255))])
+
+    def test_user_styles_follow_the_edits(self):
+        self.document.set_style(6, 11, {'color': (9, 9, 9, 255)})
+        self.document.insert_text(0, '>> ')
+        self.document.insert_text(14, '!')  # at the end of the user range: takes its style
+        self.viewer.do_set_document_style(FakeDialog((1, 1, 1, 255)))
+        self.assertEqual(self.get_colors(), [(0, 9, (1, 1, 1, 255)), (9, 15, (9, 9, 9, 255))])
+
+    def test_inserted_attributes_are_user_styles(self):
+        self.viewer.do_set_document_style(FakeDialog((1, 1, 1, 255)))
+        self.document.insert_text(11, ' red', {'color': (255, 0, 0, 255)})
+        self.viewer.do_set_document_style(FakeDialog((2, 2, 2, 255)))
+        self.assertEqual(self.get_colors(), [(0, 11, (2, 2, 2, 255)), (11, 15, (255, 0, 0, 255))])
+
+    def test_none_gives_the_range_back_to_the_theme(self):
+        self.document.set_style(0, 5, {'color': (9, 9, 9, 255)})
+        self.viewer.do_set_document_style(FakeDialog((1, 1, 1, 255)))
+        self.document.set_style(0, 5, {'color': None})
+        self.viewer.do_set_document_style(FakeDialog((1, 1, 1, 255)))
+        self.assertEqual(self.get_colors(), [(0, 11, (1, 1, 1, 255))])
+
+
+if __name__ == '__main__':
+    unittest.main()
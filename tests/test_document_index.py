@@ -0,0 +1,102 @@
+import os
+import re
+import unittest
+import pyglet
+from pyglet2_gui.document import Document, DocumentIndex
+from pyglet2_gui.gui import Frame
+from pyglet2_gui.manager import Manager
+from pyglet2_gui.theme.theme import ThemeFromPath
+from tests import get_window
+
+THEME_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'theme', 'default')
+
+
+class TestDocumentIndex(unittest.TestCase):
+    TEXT = 'first line\nsecond Line\n\nfourth LINE with line\nlast'
+
+    def setUp(self):
+        self.document = pyglet.text.document.UnformattedDocument(self.TEXT)
+        self.index = DocumentIndex(self.document)
+
+    def tearDown(self):
+        self.index.delete()
+
+    def assert_lines(self):
+        text = self.document.text
+        starts = [0] + [match.end() for match in re.finditer('\n', text)]
+        self.assertEqual(self.index.line_count, len(starts))
+        for line, start in enumerate(starts):
+            self.assertEqual(self.index.get_line_start(line), start)
+        for position in range(len(text) + 1):
+            self.assertEqual(self.index.get_line(position), text.count('\n', 0, position))
+
+    def assert_found(self, query: str, match_case: bool = True):
+        flags = 0 if match_case else re.IGNORECASE
+        expected = [(x.start(), x.end()) for x in re.finditer(re.escape(query), self.document.text, flags)]
+        self.assertEqual(list(self.index.find(query, match_case)), expected)
+
+    def test_lines(self):
+        self.assert_lines()
+
+    def test_lines_after_edits(self):
+        self.document.insert_text(5, 'X\nY\n')
+        self.assert_lines()
+        self.document.delete_text(3, 20)
+        self.assert_lines()
+        self.document.insert_text(len(self.document.text), '\nappended')
+        self.assert_lines()
+        self.document.delete_text(0, len(self.document.text))
+        self.assert_lines()
+
+    def test_find(self):
+        self.assert_found('line')
+        self.assert_found('line', match_case=False)
+        self.assert_found('li')
+        self.assert_found('missing')
+        self.assertEqual(list(self.index.find('')), [])
+
+    def test_find_from_position(self):
+        matches = list(self.index.find('line', match_case=False, start=20))
+        self.assertTrue(matches)
+        self.assertTrue(all([start >= 20 for start, end in matches]))
+
+    def test_find_after_edits(self):
+        self.assert_found('line')  # builds the trigram index
+        self.document.insert_text(len(self.document.text), ' line')
+        self.assert_found('line')
+        self.assert_found('t line')  # across the end of the previous text
+        self.document.insert_text(0, 'line ')
+        self.assert_found('line')
+        self.document.delete_text(0, 11)
+        self.assert_found('line')
+
+    def test_find_overlapping(self):
+        self.document.text = 'aaaaaa'
+        self.assertEqual(list(self.index.find('aaa')), [(0, 3), (3, 6)])
+
+
+class TestScrollToPosition(unittest.TestCase):
+    def setUp(self):
+        window = get_window()
+        # long paragraphs are wrapped in several lines of the layout.
+        paragraphs = ['paragraph %d ' % x + 'word ' * (x % 3 * 12) for x in range(60)]
+        self.text = '\n'.join(paragraphs)
+        self.document = Document(pyglet.text.document.FormattedDocument(self.text), width=150, height=100)
+        self.manager = Manager(Frame(self.document), ThemeFromPath(THEME_PATH), window=window)
+
+    def tearDown(self):
+        self.manager.delete()
+
+    def test_paragraph_is_scrolled_to_the_top(self):
+        content = self.document._content
+        self.assertGreater(len(content.lines), 60)
+        for paragraph in (1, 7, 20, 31):
+            start = self.document.index.get_line_start(paragraph)
+            self.document.scroll_to_position(start + 3)
+            line = next(x for x in content.lines if x.start == start)
+            # the knob position is rounded to pixels of the scrollbar.
+            self.assertAlmostEqual(content.view_y, line.y + line.ascent, delta=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+from pyglet2_gui.core import Controller
+from pyglet2_gui.manager import ControllerManager
+
+
+class FocusableController(Controller):
+    is_culled: bool = False
+
+    def on_gain_focus(self):
+        pass
+
+
+class TestFocusRing(unittest.TestCase):
+    def setUp(self):
+        self.manager = ControllerManager()
+        self.controllers = [FocusableController() for _ in range(4)]
+        self.manager.add_controller(Controller())  # not focusable
+        for controller in self.controllers:
+            controller.set_manager(self.manager)
+
+    def get_focus_order(self, direction: int, count: int) -> list:
+        order = []
+        for _ in range(count):
+            self.manager.set_next_focus(direction)
+            focus = self.manager._focus
+            order.append(self.controllers.index(focus) if focus is not None else None)
+        return order
+
+    def test_cycles_in_both_directions(self):
+        self.assertEqual(self.get_focus_order(1, 5), [0, 1, 2, 3, 0])
+        self.assertEqual(self.get_focus_order(-1, 3), [3, 2, 1])
+
+    def test_skips_culled_controllers(self):
+        self.controllers[0].is_culled = True
+        self.controllers[2].is_culled = True
+        self.assertEqual(self.get_focus_order(1, 3), [1, 3, 1])
+        self.assertEqual(self.get_focus_order(-1, 2), [3, 1])
+
+    def test_culled_focus_moves_on(self):
+        self.manager.set_focus(self.controllers[1])
+        self.controllers[1].is_culled = True
+        self.assertEqual(self.get_focus_order(1, 2), [2, 3])
+
+    def test_single_focusable_controller_is_toggled(self):
+        for controller in self.controllers[1:]:
+            controller.is_culled = True
+        self.assertEqual(self.get_focus_order(1, 3), [0, None, 0])
+
+    def test_nothing_to_focus(self):
+        for controller in self.controllers:
+            controller.is_culled = True
+        self.assertEqual(self.get_focus_order(1, 1), [None])
+
+    def test_removed_controllers_leave_the_ring(self):
+        self.manager.set_focus(self.controllers[1])
+        self.manager.remove_controller(self.controllers[2])
+        self.assertEqual(self.get_focus_order(1, 2), [3, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
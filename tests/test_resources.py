@@ -0,0 +1,82 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pyglet
+from pyglet2_gui.theme.resources import ResourceRegistry
+from pyglet2_gui.theme.theme import ThemeFromPath
+from tests import get_window
+
+THEME_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'theme', 'default')
+
+
+class TestResourceRegistry(unittest.TestCase):
+    def setUp(self):
+        get_window()
+        self.directory = tempfile.mkdtemp()
+        self.write_image('a.png', (255, 0, 0, 255))
+        self.write_image('b.png', (0, 255, 0, 255))
+        self.registry = ResourceRegistry()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_image(self, filename: str, color: tuple[int, int, int, int], size: int = 2):
+        path = os.path.join(self.directory, filename)
+        with open(path, 'wb') as file:
+            pyglet.image.ImageData(size, size, 'RGBA', bytes(color) * size * size).save(path, file=file)
+
+    def test_textures_are_shared_and_counted(self):
+        texture = self.registry.acquire_texture(self.directory, 'a.png')
+        self.assertIs(self.registry.acquire_texture(self.directory, 'a.png'), texture)
+        self.assertIsNot(self.registry.acquire_texture(self.directory, 'b.png'), texture)
+        self.assertEqual(self.registry.get_stats(), {'textures': 2, 'references': 3, 'decoded': 0})
+
+        self.registry.release_texture(texture)
+        self.assertEqual(self.registry.get_stats()['textures'], 2)
+        self.registry.release_texture(texture)
+        self.assertEqual(self.registry.get_stats(), {'textures': 1, 'references': 1, 'decoded': 0})
+        # released by every user: the texture is loaded again.
+        self.assertIsNot(self.registry.acquire_texture(self.directory, 'a.png'), texture)
+
+    def test_changed_file_is_a_new_texture(self):
+        texture = self.registry.acquire_texture(self.directory, 'a.png')
+        self.write_image('a.png', (0, 0, 255, 255), size=4)
+        changed = self.registry.acquire_texture(self.directory, 'a.png')
+        self.assertIsNot(changed, texture)
+        self.assertEqual(changed.width, 4)
+        self.assertEqual(self.registry.get_stats()['textures'], 2)
+
+    def test_unchanged_file_is_not_read_again(self):
+        key, data = self.registry.get_key(self.directory, 'a.png')
+        self.assertIsNotNone(data)
+        self.assertEqual(self.registry.get_key(self.directory, 'a.png'), (key, None))
+
+    def test_preloaded_images_are_uploaded_once(self):
+        keys = self.registry.preload(self.directory, ['a.png', 'b.png', 'a.png'])
+        self.assertEqual(len(keys), 2)
+        self.assertEqual(self.registry.get_stats()['decoded'], 2)
+        self.registry.acquire_texture(self.directory, 'a.png')
+        self.assertEqual(self.registry.get_stats()['decoded'], 1)
+        # loaded or already decoded images are not decoded again.
+        self.assertEqual(self.registry.preload(self.directory, ['a.png', 'b.png']), [])
+
+        self.registry.discard_decoded(keys)
+        self.assertEqual(self.registry.get_stats(), {'textures': 1, 'references': 1, 'decoded': 0})
+
+    def test_preload_in_processes(self):
+        keys = self.registry.preload(self.directory, ['a.png', 'b.png'], max_workers=2)
+        self.assertEqual(len(keys), 2)
+        texture = self.registry.acquire_texture(self.directory, 'b.png')
+        pixels = texture.get_image_data().get_data('RGBA', texture.width * 4)
+        self.assertEqual(bytes(pixels), bytes((0, 255, 0, 255)) * 4)
+        self.registry.discard_decoded(keys)
+
+    def test_theme_leaves_the_resource_path(self):
+        path = list(pyglet.resource.path)
+        ThemeFromPath(THEME_PATH).release()
+        self.assertEqual(pyglet.resource.path, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
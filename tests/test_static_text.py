@@ -0,0 +1,67 @@
+import os
+import unittest
+from pyglet2_gui.containers import VerticalContainer
+from pyglet2_gui.gui import Frame, Label
+from pyglet2_gui.manager import Manager
+from pyglet2_gui.scrollable import Scrollable
+from pyglet2_gui.theme.theme import ThemeFromPath
+from tests import get_window
+
+THEME_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'theme', 'default')
+
+
+def get_ancestors(group) -> list:
+    ancestors = []
+    while group is not None:
+        ancestors.append(group)
+        group = group.parent
+    return ancestors
+
+
+class TestStaticLabel(unittest.TestCase):
+    def setUp(self):
+        self.window = get_window()
+        self.theme = ThemeFromPath(THEME_PATH)
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.delete()
+
+    def create_manager(self, content) -> Manager:
+        manager = Manager(Frame(content), self.theme, window=self.window)
+        self.managers.append(manager)
+        manager.flush_graphics()
+        return manager
+
+    def test_static_label(self):
+        label = Label('static', static=True)
+        manager = self.create_manager(label)
+        static_text = manager.static_text
+        self.assertIn(label, static_text._texts)
+        self.assertTrue(static_text._vertex_lists)
+        self.assertGreater(label.width, 0)
+
+    def test_static_label_in_scrollable(self):
+        labels = [Label('static %d' % x, static=True) for x in range(20)]
+        scrollable = Scrollable(VerticalContainer(labels), height=60)
+        manager = self.create_manager(scrollable)
+
+        static_text = scrollable.static_text
+        self.assertIsNot(static_text, manager.static_text)
+        self.assertEqual(set(static_text._texts), set(labels))
+        # the baked glyphs are drawn in the group of the scrollable, which clips them.
+        self.assertTrue(static_text._groups)
+        for group in static_text._groups.values():
+            self.assertIn(scrollable.root_group, get_ancestors(group))
+
+    def test_scrollable_unload_releases_its_static_text(self):
+        scrollable = Scrollable(VerticalContainer([Label('static', static=True)]), height=60)
+        manager = self.create_manager(scrollable)
+        self.assertEqual(len(manager._static_texts), 1)
+        manager.unload()
+        self.assertEqual(manager._static_texts, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
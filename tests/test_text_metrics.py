@@ -0,0 +1,36 @@
+import unittest
+import pyglet
+from pyglet2_gui.text_metrics import TextMetricsCache
+from tests import get_window
+
+
+class TestTextMetricsCache(unittest.TestCase):
+    def setUp(self):
+        get_window()
+        self.cache = TextMetricsCache(max_widths=2)
+
+    def test_width_is_the_label_width(self):
+        for text, font_size, bold in [('Hello World', 13, False), ('AVAWAy', 20, True), ('  tail  ', 9, False),
+                                      ('', 13, False)]:
+            label = pyglet.text.Label(text, font_size=font_size, bold=bold)
+            self.assertEqual(self.cache.get_text_width((None, font_size, bold, False), text), label.content_width)
+            label.delete()
+
+    def test_widths_are_cached(self):
+        key = (None, 13, False, False)
+        width = self.cache.get_text_width(key, 'cached')
+        self.assertEqual(self.cache.get_text_width(key, 'cached'), width)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.cache.get_text_width(key, 'b')
+        self.cache.get_text_width(key, 'c')  # drops the least recently used
+        self.cache.get_text_width(key, 'cached')
+        self.assertEqual(self.cache.misses, 4)
+
+    def test_metrics(self):
+        metrics = self.cache.get_metrics((None, 13, False, False))
+        self.assertEqual(metrics.height, metrics.ascent - metrics.descent)
+        self.assertGreater(metrics.glyph_width, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
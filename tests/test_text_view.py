@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+from pyglet2_gui.text_view import LargeTextView
+
+
+class TestLargeTextViewIndex(unittest.TestCase):
+    def setUp(self):
+        file, self.path = tempfile.mkstemp(suffix='.log')
+        os.close(file)
+        self.views = []
+
+    def tearDown(self):
+        for view in self.views:
+            view._stop_indexing.set()
+            if view._index_thread is not None:
+                view._index_thread.join()
+            if view._mmap is not None:
+                view._mmap.close()
+            view._file.close()
+        os.remove(self.path)
+
+    def write(self, text: str, mode: str = 'w'):
+        with open(self.path, mode, encoding='utf-8', newline='') as file:
+            file.write(text)
+
+    def open_view(self, **kwargs) -> LargeTextView:
+        view = LargeTextView(self.path, **kwargs)
+        self.views.append(view)
+        self.wait(view)
+        return view
+
+    @staticmethod
+    def wait(view: LargeTextView):
+        if view._index_thread is not None:
+            view._index_thread.join()
+
+    def test_lines(self):
+        lines = ['line %d' % x for x in range(1000)]
+        self.write('\n'.join(lines))
+        view = self.open_view()
+        self.assertEqual(view.line_count, 1000)
+        self.assertEqual(view.get_lines(0, 3), lines[:3])
+        self.assertEqual(view.get_lines(998, 10), lines[998:])
+        self.assertEqual(view.get_lines(2000, 10), [])
+
+    def test_line_endings_and_long_lines(self):
+        self.write('a\r\n' + 'b' * 100 + '\n\nc\n')
+        view = self.open_view(max_line_length=10)
+        self.assertEqual(view.line_count, 5)  # the empty line after the last newline counts
+        self.assertEqual(view.get_lines(0, 5), ['a', 'b' * 10, '', 'c', ''])
+
+    def test_empty_file(self):
+        view = self.open_view()
+        self.assertEqual(view.line_count, 1)
+        self.assertEqual(view.get_lines(0, 1), [])
+
+    def test_appended_lines(self):
+        self.write('one\ntwo\n')
+        view = self.open_view()
+        self.write('three\nfour', mode='a')
+        view._remap()
+        self.wait(view)
+        self.assertEqual(view.line_count, 4)
+        self.assertEqual(view.get_lines(0, 4), ['one', 'two', 'three', 'four'])
+
+    def test_truncated_file(self):
+        self.write('one\ntwo\nthree\n')
+        view = self.open_view()
+        self.write('new\n')
+        view._remap()
+        self.wait(view)
+        self.assertEqual(view.get_lines(0, 2), ['new', ''])
+
+
+if __name__ == '__main__':
+    unittest.main()